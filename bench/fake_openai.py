@@ -0,0 +1,203 @@
+"""
+Stand-in OpenAI-compatible server for benchmarks.
+
+Implements just what the app calls:
+- POST /v1/audio/transcriptions (json / verbose_json with segments)
+- POST /v1/chat/completions (plain and stream=True)
+
+Latency is drawn per request from a log-normal distribution around a configurable median,
+and a configurable fraction of requests fail with 429 (with Retry-After) or 500.
+
+    python -m bench.fake_openai --port 9100 --transcription-latency 2 --llm-latency 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+INSIGHT_KEYS = [
+    "session_overview",
+    "core_relationship_dynamics_observed",
+    "expressed_needs_and_concerns_as_heard",
+    "moments_of_alignment_understanding_or_repair",
+    "reflective_questions_for_consideration",
+]
+
+
+@dataclass
+class SimConfig:
+    transcription_latency: float = 2.0  # median seconds
+    llm_latency: float = 3.0  # median seconds
+    jitter: float = 0.3  # log-normal sigma
+    error_rate: float = 0.0  # fraction of requests that fail
+    rate_limit_share: float = 0.5  # of failures, fraction returned as 429 (rest 500)
+    segments: int = 20
+
+
+def create_app(cfg: SimConfig) -> FastAPI:
+    app = FastAPI(title="fake-openai")
+    stats = {"transcriptions": 0, "chat": 0, "errors": 0}
+
+    async def _delay(median: float) -> None:
+        if median > 0:
+            await asyncio.sleep(random.lognormvariate(0, cfg.jitter) * median)
+
+    def _maybe_error() -> JSONResponse | None:
+        if random.random() >= cfg.error_rate:
+            return None
+        stats["errors"] += 1
+        if random.random() < cfg.rate_limit_share:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (simulated)", "type": "rate_limit"}},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        return JSONResponse(
+            {"error": {"message": "Internal error (simulated)", "type": "server_error"}},
+            status_code=500,
+        )
+
+    @app.get("/stats")
+    def get_stats() -> dict[str, int]:
+        return stats
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        form = await request.form()
+        await _delay(cfg.transcription_latency)
+        if (err := _maybe_error()) is not None:
+            return err
+        stats["transcriptions"] += 1
+        segments = [
+            {
+                "id": i,
+                "start": i * 5.0,
+                "end": i * 5.0 + 4.5,
+                "text": f" Simulated sentence number {i} about feeling heard"
+                " and planning the week.",
+            }
+            for i in range(cfg.segments)
+        ]
+        text = "".join(s["text"] for s in segments).strip()
+        if form.get("response_format") == "verbose_json":
+            return {
+                "task": "transcribe",
+                "language": "english",
+                "duration": cfg.segments * 5.0,
+                "text": text,
+                "segments": segments,
+            }
+        return {"text": text}
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake")
+        await _delay(cfg.llm_latency)
+        if (err := _maybe_error()) is not None:
+            return err
+        stats["chat"] += 1
+        content = json.dumps({k: [f"Simulated {k.replace('_', ' ')}."] for k in INSIGHT_KEYS})
+        usage = {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200}
+        cid = f"chatcmpl-{uuid4().hex}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            return {
+                "id": cid,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+
+        async def _stream():
+            step = 24
+            for i in range(0, len(content), step):
+                chunk = {
+                    "id": cid,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"content": content[i : i + step]},
+                            "finish_reason": None,
+                        }
+                    ],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(0.005)
+            done = {
+                "id": cid,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(done)}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                tail = {
+                    "id": cid,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(tail)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_stream(), media_type="text/event-stream")
+
+    return app
+
+
+def add_sim_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--transcription-latency", type=float, default=2.0)
+    parser.add_argument("--llm-latency", type=float, default=3.0)
+    parser.add_argument("--jitter", type=float, default=0.3, help="log-normal sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-share", type=float, default=0.5)
+
+
+def sim_config_from_args(args: argparse.Namespace) -> SimConfig:
+    return SimConfig(
+        transcription_latency=args.transcription_latency,
+        llm_latency=args.llm_latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_share=args.rate_limit_share,
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Simulated OpenAI-compatible provider.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_sim_args(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(sim_config_from_args(args)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+End-to-end throughput / latency benchmark.
+
+Starts a simulated OpenAI-compatible provider (bench/fake_openai.py), the real API
+(src/app/main.py via uvicorn) and worker processes (src/app/worker.py) pointed at it, then
+drives POST /api/jobs at a fixed rate and reports per-stage p50/p95/p99 and jobs/sec.
+
+Requires a reachable PostgreSQL at DATABASE_URL (jobs are written to it like normal jobs).
+
+    python -m bench.run --rate 2 --duration 60 --workers 2 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import math
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from .fake_openai import add_sim_args, create_app, sim_config_from_args
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Stage boundaries, as published on the job event stream.
+STAGES = [
+    ("queue_wait", "uploaded", "transcribing"),
+    ("transcription", "transcribing", "summarizing"),
+    ("llm_and_persist", "summarizing", "completed"),
+]
+
+
+def make_wav(seconds: float, rate: int = 16000) -> bytes:
+    """A quiet tone; content doesn't matter to the simulated provider."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        frames = b"".join(
+            struct.pack("<h", int(800 * math.sin(2 * math.pi * 220 * i / rate)))
+            for i in range(int(seconds * rate))
+        )
+        w.writeframes(frames)
+    return buf.getvalue()
+
+
+def _start_fake_provider(args: argparse.Namespace) -> threading.Thread:
+    import uvicorn
+
+    config = uvicorn.Config(
+        create_app(sim_config_from_args(args)),
+        host="127.0.0.1",
+        port=args.provider_port,
+        log_level="warning",
+    )
+    server = uvicorn.Server(config)
+    t = threading.Thread(target=server.run, daemon=True)
+    t.start()
+    return t
+
+
+def _wait_http(url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def pct(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class EventRecorder:
+    """Timestamps every stage transition seen on GET /api/jobs/events."""
+
+    def __init__(self, api: str) -> None:
+        self.api = api
+        self.times: dict[str, dict[str, float]] = defaultdict(dict)
+        self.status: dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        with httpx.stream("GET", f"{self.api}/api/jobs/events", timeout=None) as resp:
+            for line in resp.iter_lines():
+                if self._stop.is_set():
+                    return
+                if not line.startswith("data: "):
+                    continue
+                ev = json.loads(line[len("data: ") :])
+                if ev.get("type") == "insight":
+                    self.times[ev["jobId"]].setdefault("first_insight", time.perf_counter())
+                    continue
+                job_id = ev.get("jobId")
+                stage = ev.get("stage")
+                if job_id and stage:
+                    self.times[job_id].setdefault(stage, time.perf_counter())
+                if job_id and ev.get("status"):
+                    self.status[job_id] = ev["status"]
+
+
+def _positive_float(value: str) -> float:
+    f = float(value)
+    if f <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0: {value}")
+    return f
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end jobs benchmark.")
+    parser.add_argument(
+        "--rate", type=_positive_float, default=1.0, help="Jobs submitted per second."
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep submitting.")
+    parser.add_argument("--drain-timeout", type=float, default=300.0)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs per worker process.")
+    parser.add_argument("--audio-seconds", type=float, default=5.0)
+    parser.add_argument("--api-port", type=int, default=8765)
+    parser.add_argument("--provider-port", type=int, default=9100)
+    parser.add_argument("--json", dest="json_out", help="Also write the report as JSON here.")
+    add_sim_args(parser)
+    args = parser.parse_args(argv)
+
+    _start_fake_provider(args)
+    _wait_http(f"http://127.0.0.1:{args.provider_port}/stats")
+
+    outdir = tempfile.mkdtemp(prefix="bench_outputs_")
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.provider_port}/v1",
+        "OUTPUT_DIR": outdir,
+        # Every job must do the full work; identical uploads would otherwise hit the caches.
+        "TRANSCRIPTION_CACHE_ENABLED": "false",
+        "LLM_CACHE_ENABLED": "false",
+        "JOB_POLL_INTERVAL_SECONDS": "0.2",
+    }
+    api = f"http://127.0.0.1:{args.api_port}"
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.app.main:app", "--port", str(args.api_port),
+             "--log-level", "warning"],
+            cwd=ROOT,
+            env=env,
+        )
+    ]
+    procs += [
+        subprocess.Popen(
+            [sys.executable, "-m", "src.app.worker", "--concurrency", str(args.concurrency)],
+            cwd=ROOT,
+            env=env,
+        )
+        for _ in range(args.workers)
+    ]
+
+    try:
+        _wait_http(f"{api}/health")
+        recorder = EventRecorder(api)
+        recorder.start()
+        time.sleep(0.5)  # let the event stream attach
+
+        audio = make_wav(args.audio_seconds)
+        submitted: dict[str, float] = {}
+        upload_ms: list[float] = []
+        submit_errors = 0
+        lock = threading.Lock()
+
+        def submit() -> None:
+            nonlocal submit_errors
+            t0 = time.perf_counter()
+            try:
+                r = httpx.post(
+                    f"{api}/api/jobs",
+                    files={"audio_file": ("bench.wav", audio, "audio/wav")},
+                    data={"option_id": "bench", "source_id": "bench"},
+                    timeout=60.0,
+                )
+                r.raise_for_status()
+                job_id = r.json()["id"]
+            except Exception:
+                with lock:
+                    submit_errors += 1
+                return
+            with lock:
+                submitted[job_id] = t0
+                upload_ms.append((time.perf_counter() - t0) * 1000)
+
+        start = time.perf_counter()
+        interval = 1.0 / args.rate
+        n = int(args.duration * args.rate)
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            for i in range(n):
+                # Open loop: submit on schedule regardless of how slow earlier requests are.
+                delay = start + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(submit)
+
+        deadline = time.perf_counter() + args.drain_timeout
+        while time.perf_counter() < deadline:
+            done = [j for j in submitted if recorder.status.get(j) in ("completed", "failed")]
+            if len(done) == len(submitted):
+                break
+            time.sleep(0.5)
+        elapsed = time.perf_counter() - start
+        recorder.stop()
+
+        stage_ms: dict[str, list[float]] = defaultdict(list)
+        completed = failed = 0
+        for job_id, t_submit in submitted.items():
+            ts = recorder.times.get(job_id, {})
+            status = recorder.status.get(job_id)
+            completed += status == "completed"
+            failed += status == "failed"
+            for name, a, b in STAGES:
+                if a in ts and b in ts:
+                    stage_ms[name].append((ts[b] - ts[a]) * 1000)
+            if "first_insight" in ts:
+                stage_ms["time_to_first_insight"].append((ts["first_insight"] - t_submit) * 1000)
+            if "completed" in ts:
+                stage_ms["end_to_end"].append((ts["completed"] - t_submit) * 1000)
+        stage_ms["upload_request"] = upload_ms
+
+        report = {
+            "submitted": len(submitted),
+            "submit_errors": submit_errors,
+            "completed": completed,
+            "failed": failed,
+            "unfinished": len(submitted) - completed - failed,
+            "elapsed_seconds": round(elapsed, 2),
+            "jobs_per_second": round(completed / elapsed, 3) if elapsed else 0.0,
+            "stages_ms": {
+                name: {
+                    "n": len(v),
+                    "p50": round(pct(v, 50), 1),
+                    "p95": round(pct(v, 95), 1),
+                    "p99": round(pct(v, 99), 1),
+                    "mean": round(statistics.fmean(v), 1) if v else float("nan"),
+                }
+                for name, v in stage_ms.items()
+            },
+            "provider": httpx.get(f"http://127.0.0.1:{args.provider_port}/stats").json(),
+        }
+
+        print(f"jobs: {report['completed']} completed, {report['failed']} failed, "
+              f"{report['unfinished']} unfinished, {submit_errors} submit errors")
+        print(f"throughput: {report['jobs_per_second']} jobs/s over {report['elapsed_seconds']}s")
+        print(f"{'stage':>24} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+        for name, st in report["stages_ms"].items():
+            print(f"{name:>24} {st['n']:>6} {st['p50']:>9} {st['p95']:>9} {st['p99']:>9}")
+        if args.json_out:
+            Path(args.json_out).write_text(json.dumps(report, indent=2) + "\n")
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,8 @@ import {
   Upload,
 } from "lucide-react";
 
-import { createJob, getJob, getJobResult, listJobs } from "./api";
+import { createJobResumable, getJob, getJobResult, listJobs, subscribeJobEvents } from "./api";
+import type { InsightSectionEventDto, JobEventDto } from "./api";
 
 // --- MOCK DATA & TYPES ---
 
@@ -244,6 +245,14 @@ type InsightsJson = {
   reflective_questions_for_consideration: string[];
 };
 
+const INSIGHT_SECTION_TITLES: Record<string, string> = {
+  session_overview: "Session Overview",
+  core_relationship_dynamics_observed: "Core Relationship Dynamics",
+  expressed_needs_and_concerns_as_heard: "Expressed Needs & Concerns",
+  moments_of_alignment_understanding_or_repair: "Moments of Alignment",
+  reflective_questions_for_consideration: "Reflective Questions",
+};
+
 function Paragraphs({
   items,
   paragraphClassName,
@@ -744,7 +753,10 @@ function DashboardPage({
   );
   const [progress, setProgress] = useState(0);
   const [activeJobId, setActiveJobId] = useState<string | null>(null);
+  // Insight sections streamed while the job is still generating, in arrival order.
+  const [liveSections, setLiveSections] = useState<InsightSectionEventDto[]>([]);
   const pollRef = useRef<number | null>(null);
+  const eventsRef = useRef<(() => void) | null>(null);
   const fileInputRef = useRef<HTMLInputElement | null>(null);
 
   const refreshJobs = async () => {
@@ -798,46 +810,79 @@ function DashboardPage({
     if (!file || !selectedOptionId) return;
     setProcessState("uploading");
     setProgress(5);
+    setLiveSections([]);
     addToast("Processing started", "Uploading your file...");
 
     try {
-      const job = await createJob({ file, optionId: selectedOptionId });
+      const job = await createJobResumable({ file, optionId: selectedOptionId });
       setActiveJobId(job.id);
       await refreshJobs();
 
-      // Simple UI progression while we poll real status.
       setProcessState("transcribing");
       setProgress(30);
 
-      if (pollRef.current) window.clearInterval(pollRef.current);
-      pollRef.current = window.setInterval(async () => {
-        try {
-          const j = await getJob(job.id);
-          if (j.status === "processing") {
-            // keep nudging progress without pretending accuracy
-            setProgress((p) => Math.min(90, Math.max(p, 35) + 2));
-            setProcessState((s) => (s === "transcribing" ? "generating" : s));
-            return;
-          }
-          if (pollRef.current) window.clearInterval(pollRef.current);
-          pollRef.current = null;
-          await refreshJobs();
-
-          if (j.status === "failed") {
-            setProcessState("idle");
-            setProgress(0);
-            addToast("Job failed", j.error || "Unknown error");
-            return;
-          }
+      const finish = async (status: string, error: string | null) => {
+        if (eventsRef.current) eventsRef.current();
+        eventsRef.current = null;
+        if (pollRef.current) window.clearInterval(pollRef.current);
+        pollRef.current = null;
+        await refreshJobs();
+
+        if (status === "failed") {
+          setProcessState("idle");
+          setProgress(0);
+          addToast("Job failed", error || "Unknown error");
+          return;
+        }
 
-          setProcessState("completed");
-          setProgress(100);
-          addToast("Job Complete", "Redirecting to results...");
-          setTimeout(() => onProcessComplete(job.id), 500);
-        } catch (e: any) {
-          // ignore transient errors while backend is starting
+        setProcessState("completed");
+        setProgress(100);
+        addToast("Job Complete", "Redirecting to results...");
+        setTimeout(() => onProcessComplete(job.id), 500);
+      };
+
+      const onEvent = (ev: JobEventDto) => {
+        if (ev.status !== "processing") {
+          finish(ev.status, ev.error);
+          return;
         }
-      }, 1200);
+        if (ev.stage === "summarizing") {
+          setProcessState("generating");
+          setProgress((p) => Math.max(p, 65));
+        } else if (ev.stage === "transcribing") {
+          setProcessState("transcribing");
+          setProgress((p) => Math.max(p, 35));
+        }
+      };
+
+      // Fallback if the event stream is unavailable (e.g. a proxy strips SSE): poll real status.
+      const startPolling = () => {
+        if (pollRef.current) window.clearInterval(pollRef.current);
+        pollRef.current = window.setInterval(async () => {
+          try {
+            const j = await getJob(job.id);
+            if (j.status === "processing") {
+              // keep nudging progress without pretending accuracy
+              setProgress((p) => Math.min(90, Math.max(p, 35) + 2));
+              setProcessState((s) => (s === "transcribing" ? "generating" : s));
+              return;
+            }
+            await finish(j.status, j.error);
+          } catch (e: any) {
+            // ignore transient errors while backend is starting
+          }
+        }, 1200);
+      };
+
+      if (eventsRef.current) eventsRef.current();
+      // Each streamed insights section is shown right away and moves the bar closer to done.
+      const onInsight = (ev: InsightSectionEventDto) => {
+        setProcessState("generating");
+        setProgress((p) => Math.min(95, Math.max(p, 65) + 6));
+        setLiveSections((prev) => [...prev.filter((sec) => sec.key !== ev.key), ev]);
+      };
+
+      eventsRef.current = subscribeJobEvents(job.id, onEvent, startPolling, onInsight);
     } catch (e: any) {
       setProcessState("idle");
       setProgress(0);
@@ -1087,6 +1132,23 @@ function DashboardPage({
                     {processState === "generating" && "> Applying structured prompt model..."}
                     {processState === "completed" && "> Finalizing deliverable document..."}
                   </div>
+
+                  {liveSections.length > 0 && (
+                    <div className="space-y-4 text-sm">
+                      {liveSections.map((sec) => (
+                        <section key={sec.key}>
+                          <h4 className="font-semibold text-slate-900 mb-2">
+                            {INSIGHT_SECTION_TITLES[sec.key] || sec.key}
+                          </h4>
+                          {sec.truncated ? (
+                            <p className="text-slate-500">Too long to preview; shown once the job completes.</p>
+                          ) : (
+                            <Paragraphs items={sec.value} />
+                          )}
+                        </section>
+                      ))}
+                    </div>
+                  )}
                 </div>
               )}
             </CardContent>
@@ -1,13 +1,21 @@
 export type JobStatus = "processing" | "completed" | "failed";
 
+export type JobStage = "uploading" | "uploaded" | "transcribing" | "summarizing" | "completed" | "failed";
+
+/** Scheduling lane: interactive jobs are picked before bulk imports. */
+export type JobPriority = "interactive" | "bulk";
+
 export interface JobDto {
   id: string;
   createdAt: string;
   fileName: string | null;
   optionId: string;
   status: JobStatus;
+  stage?: JobStage | null;
   duration: string | null;
+  priority?: JobPriority;
   error: string | null;
+  stageTimings?: Record<string, number> | null;
   resultPath: string | null;
 }
 
@@ -15,6 +23,7 @@ export interface JobListDto {
   items: JobDto[];
   limit: number;
   offset: number;
+  nextCursor?: string | null;
 }
 
 export interface JobResultDto {
@@ -54,16 +63,96 @@ export async function createJob(params: {
   file: File;
   optionId: string;
   sourceId?: string;
+  priority?: JobPriority;
 }): Promise<JobDto> {
   const fd = new FormData();
   fd.append("audio_file", params.file);
   fd.append("option_id", params.optionId);
   if (params.sourceId) fd.append("source_id", params.sourceId);
+  if (params.priority) fd.append("priority", params.priority);
 
   const res = await fetch(`${API_BASE}/api/jobs`, { method: "POST", body: fd });
   return (await jsonOrThrow(res)) as JobDto;
 }
 
+interface UploadDto {
+  id: string;
+  jobId: string;
+  status: "open" | "completed";
+  sizeBytes: number;
+  offset: number;
+  chunkBytes: number;
+}
+
+/**
+ * Upload through the resumable protocol (POST /api/uploads, PUT byte ranges, complete).
+ * A failed chunk is retried from the server's offset, so a dropped connection only
+ * re-sends the chunk that was in flight.
+ */
+export async function createJobResumable(params: {
+  file: File;
+  optionId: string;
+  sourceId?: string;
+  priority?: JobPriority;
+  onProgress?: (sentBytes: number, totalBytes: number) => void;
+  maxRetries?: number;
+}): Promise<JobDto> {
+  const { file } = params;
+  const created = await fetch(`${API_BASE}/api/uploads`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      file_name: file.name,
+      size_bytes: file.size,
+      option_id: params.optionId,
+      source_id: params.sourceId ?? null,
+      priority: params.priority ?? "interactive",
+    }),
+  });
+  const upload = (await jsonOrThrow(created)) as UploadDto;
+  const url = `${API_BASE}/api/uploads/${encodeURIComponent(upload.id)}`;
+
+  let offset = upload.offset;
+  let failures = 0;
+  while (offset < file.size) {
+    const end = Math.min(offset + upload.chunkBytes, file.size);
+    let res: Response | null = null;
+    try {
+      res = await fetch(url, {
+        method: "PUT",
+        headers: { "Content-Range": `bytes ${offset}-${end - 1}/${file.size}` },
+        body: file.slice(offset, end),
+      });
+    } catch {
+      res = null; // network error
+    }
+    if (res === null || res.status >= 500) {
+      failures += 1;
+      if (failures > (params.maxRetries ?? 5)) {
+        throw new Error("Upload failed: connection lost");
+      }
+      await new Promise((r) => window.setTimeout(r, 1000 * 2 ** (failures - 1)));
+      try {
+        offset = ((await jsonOrThrow(await fetch(url))) as UploadDto).offset;
+      } catch {
+        // keep the last known offset; a wrong one is corrected by the 409 below
+      }
+      continue;
+    }
+    if (res.status === 409) {
+      // Server has a different offset (e.g. an earlier attempt did land): resume from it.
+      offset = ((await jsonOrThrow(await fetch(url))) as UploadDto).offset;
+      continue;
+    }
+    offset = ((await jsonOrThrow(res)) as UploadDto).offset;
+    failures = 0;
+    params.onProgress?.(offset, file.size);
+  }
+
+  const done = await fetch(`${url}/complete`, { method: "POST" });
+  return (await jsonOrThrow(done)) as JobDto;
+}
+
 export async function listJobs(limit = 50, offset = 0): Promise<JobListDto> {
   const res = await fetch(`${API_BASE}/api/jobs?limit=${limit}&offset=${offset}`);
   return (await jsonOrThrow(res)) as JobListDto;
@@ -74,9 +163,72 @@ export async function getJob(jobId: string): Promise<JobDto> {
   return (await jsonOrThrow(res)) as JobDto;
 }
 
+/** Re-queue a failed job; it resumes from its last completed stage. */
+export async function retryJob(jobId: string): Promise<JobDto> {
+  const res = await fetch(`${API_BASE}/api/jobs/${encodeURIComponent(jobId)}/retry`, { method: "POST" });
+  return (await jsonOrThrow(res)) as JobDto;
+}
+
 export async function getJobResult(jobId: string): Promise<JobResultDto> {
   const res = await fetch(`${API_BASE}/api/jobs/${encodeURIComponent(jobId)}/result`);
   return (await jsonOrThrow(res)) as JobResultDto;
 }
 
+export interface JobEventDto {
+  jobId: string;
+  status: JobStatus;
+  stage: JobStage | null;
+  error: string | null;
+}
+
+export interface InsightSectionEventDto {
+  jobId: string;
+  type: "insight";
+  key: string;
+  value?: string[];
+  truncated?: boolean;
+}
 
+/**
+ * Subscribe to a job's status via Server-Sent Events.
+ * Returns a function that closes the stream. `onError` fires if the stream can't be kept open.
+ * `onInsight` receives each insights section as soon as the model has finished writing it.
+ */
+export function subscribeJobEvents(
+  jobId: string,
+  onEvent: (ev: JobEventDto) => void,
+  onError?: () => void,
+  onInsight?: (ev: InsightSectionEventDto) => void
+): () => void {
+  const es = new EventSource(`${API_BASE}/api/jobs/${encodeURIComponent(jobId)}/events`);
+  let done = false;
+  es.addEventListener("job", (msg) => {
+    try {
+      const ev = JSON.parse((msg as MessageEvent).data) as JobEventDto;
+      onEvent(ev);
+      if (ev.status !== "processing") {
+        done = true;
+        es.close();
+      }
+    } catch {
+      // ignore malformed events
+    }
+  });
+  es.addEventListener("insight", (msg) => {
+    try {
+      onInsight?.(JSON.parse((msg as MessageEvent).data) as InsightSectionEventDto);
+    } catch {
+      // ignore malformed events
+    }
+  });
+  es.onerror = () => {
+    // The server closes the stream after the terminal event; anything else is a real error.
+    if (done) return;
+    es.close();
+    onError?.();
+  };
+  return () => {
+    done = true;
+    es.close();
+  };
+}
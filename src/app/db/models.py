@@ -2,15 +2,45 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    BigInteger,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
 
+# Text search configuration used for every tsvector/tsquery (services/search.py).
+SEARCH_TEXT_CONFIG = "english"
+
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_status_created_at", "status", "created_at"),
+        Index("ix_jobs_source_id_created_at", "source_id", "created_at"),
+        Index("ix_jobs_finished_at", "finished_at"),
+        # Queue heads per (lane, tenant) for claim_next_job; the tenant expression must match
+        # services/queue.py's exactly for the planner to use it.
+        Index(
+            "ix_jobs_queue_heads_tenant",
+            "priority",
+            text("coalesce(source_id, '')"),
+            "created_at",
+            postgresql_where=text("status = 'processing'"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -18,11 +48,32 @@ class Job(Base):
     option_id: Mapped[str] = mapped_column(String(64), nullable=False)
 
     status: Mapped[str] = mapped_column(String(32), nullable=False)  # processing|completed|failed
+    # uploading|uploaded|transcribing|summarizing|completed|failed (finer-grained than status)
+    stage: Mapped[str | None] = mapped_column(String(32), nullable=True)
     duration: Mapped[str | None] = mapped_column(String(64), nullable=True)
     source_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # Scheduling lane: interactive|bulk (services/queue.py).
+    priority: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="interactive", server_default="interactive"
+    )
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     audio_path: Mapped[str | None] = mapped_column(Text, nullable=True)
+    audio_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Set when the job last became completed/failed; the recording is deleted RETENTION_AUDIO_DAYS
+    # later (services/retention.py), which clears audio_path and sets audio_purged_at.
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    audio_purged_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Original vs. processed size/duration and time spent (services/audio.py PreprocessStats).
+    preprocess_stats: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Seconds per stage: upload_save, queue_wait, transcription, llm, persist (services/metrics.py).
+    stage_timings: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    # Queue bookkeeping (see services/queue.py).
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    locked_by: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     result: Mapped["JobResult | None"] = relationship(
         back_populates="job",
@@ -33,22 +84,134 @@ class Job(Base):
 
 class JobResult(Base):
     __tablename__ = "job_results"
+    __table_args__ = (
+        Index("ix_job_results_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     job_id: Mapped[str] = mapped_column(
         String(64), ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True
     )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
-    transcript: Mapped[str] = mapped_column(Text, nullable=False)
+    # Large values live out of row in `blobs` (services/blobs.py); the *_blob column then holds
+    # the content hash and the inline column is NULL.
+    transcript: Mapped[str | None] = mapped_column(Text, nullable=True)
+    transcript_blob: Mapped[str | None] = mapped_column(String(64), nullable=True)
     transcript_segments: Mapped[list[dict] | None] = mapped_column(JSONB, nullable=True)
-    deliverable: Mapped[str] = mapped_column(Text, nullable=False)
+    segments_blob: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    deliverable: Mapped[str | None] = mapped_column(Text, nullable=True)
+    deliverable_blob: Mapped[str | None] = mapped_column(String(64), nullable=True)
     insights_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
-    llm_provider: Mapped[str] = mapped_column(String(64), nullable=False)
-    llm_model: Mapped[str] = mapped_column(String(128), nullable=False)
+    # NULL while only the transcript checkpoint exists (LLM stage not finished yet).
+    llm_provider: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    llm_model: Mapped[str | None] = mapped_column(String(128), nullable=True)
     transcription_provider: Mapped[str] = mapped_column(String(64), nullable=False)
     transcription_model: Mapped[str] = mapped_column(String(128), nullable=False)
+    # LLM strategy + per-stage latency/token usage (see services/llm.py LLMResult).
+    llm_stats: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # services/llm.py PROMPT_VERSION of the deliverable (NULL for stub output or old rows).
+    prompt_version: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    # Full-text index of the transcript (services/search.py keeps it in sync on write).
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     job: Mapped["Job"] = relationship(back_populates="result")
 
 
+class SegmentIndex(Base):
+    """
+    One row per transcript segment, for timestamped full-text hits.
+    """
+
+    __tablename__ = "segment_index"
+    __table_args__ = (Index("ix_segment_index_tsv", "tsv", postgresql_using="gin"),)
+
+    job_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    start: Mapped[float | None] = mapped_column(Float, nullable=True)
+    end: Mapped[float | None] = mapped_column(Float, nullable=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    tsv: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(f"to_tsvector('{SEARCH_TEXT_CONFIG}', text)", persisted=True)
+    )
+
+
+class Blob(Base):
+    """
+    Content-addressed, compressed storage for large result payloads.
+    """
+
+    __tablename__ = "blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of raw bytes
+    codec: Mapped[str] = mapped_column(String(16), nullable=False)  # zstd|zlib|none
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    stored_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Last time this content was stored (refreshed on dedupe); orphans are purged by age.
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ReanalysisRun(Base):
+    """
+    A bulk re-run of the LLM stage over stored transcripts (services/reanalysis.py).
+    """
+
+    __tablename__ = "reanalysis_runs"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # pending|running|completed|cancelled
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    # Results are brought to this prompt version.
+    prompt_version: Mapped[str] = mapped_column(String(16), nullable=False)
+    filters: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    concurrency: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Keyset position (job id) of the last finished batch; a resumed run continues after it.
+    cursor: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+    locked_by: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class RateLimitBucket(Base):
+    """
+    Shared token bucket for provider rate limits (services/ratelimit.py).
+    """
+
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)  # e.g. openai:<model>:tokens
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Set after a 429 so every process pauses, not just the one that was rejected.
+    blocked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class Upload(Base):
+    """
+    A resumable upload session feeding one job (services/uploads.py).
+    """
+
+    __tablename__ = "uploads"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    job_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)  # open|completed|expired
+    path: Mapped[str] = mapped_column(Text, nullable=False)
+    total_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Bytes durably written; the file may be longer after a crash and is truncated to this.
+    received_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
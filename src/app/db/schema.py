@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from . import models  # noqa: F401  (register tables on Base.metadata)
+from .base import Base
+
+# Prototype migrations: add new columns/indexes if missing.
+# (Safe for Postgres; no-op if already present.)
+_MIGRATIONS: list[str] = [
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS transcript_segments JSONB",
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS insights_json JSONB",
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS llm_stats JSONB",
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS transcript_blob VARCHAR(64)",
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS segments_blob VARCHAR(64)",
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS deliverable_blob VARCHAR(64)",
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS search_vector TSVECTOR",
+    "ALTER TABLE job_results ADD COLUMN IF NOT EXISTS prompt_version VARCHAR(16)",
+    "CREATE INDEX IF NOT EXISTS ix_job_results_search_vector "
+    "ON job_results USING gin (search_vector)",
+    "ALTER TABLE job_results ALTER COLUMN transcript DROP NOT NULL",
+    "ALTER TABLE job_results ALTER COLUMN deliverable DROP NOT NULL",
+    "ALTER TABLE job_results ALTER COLUMN llm_provider DROP NOT NULL",
+    "ALTER TABLE job_results ALTER COLUMN llm_model DROP NOT NULL",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS stage VARCHAR(32)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS audio_sha256 VARCHAR(64)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS preprocess_stats JSONB",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS stage_timings JSONB",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS locked_by VARCHAR(128)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS locked_until TIMESTAMPTZ",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_created_at_id ON jobs (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_status_created_at ON jobs (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_source_id_created_at ON jobs (source_id, created_at)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS finished_at TIMESTAMPTZ",
+    # Jobs finished before finished_at existed: the best known bound, so retention sees them.
+    "UPDATE jobs SET finished_at = created_at "
+    "WHERE status IN ('completed', 'failed') AND finished_at IS NULL",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS audio_purged_at TIMESTAMPTZ",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_finished_at ON jobs (finished_at)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS priority VARCHAR(16) NOT NULL DEFAULT 'interactive'",
+    # Replaced by an index on the tenant expression claim_next_job groups by.
+    "DROP INDEX IF EXISTS ix_jobs_queue_heads",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_queue_heads_tenant "
+    "ON jobs (priority, (coalesce(source_id, '')), created_at) WHERE status = 'processing'",
+]
+
+
+def ensure_schema(engine: Engine) -> None:
+    """
+    Prototype-friendly: auto-create tables if missing, then apply additive migrations.
+    In production you would use Alembic migrations.
+    """
+    Base.metadata.create_all(bind=engine)
+    try:
+        with engine.begin() as conn:
+            for stmt in _MIGRATIONS:
+                conn.execute(text(stmt))
+    except Exception:
+        # If the DB isn't reachable yet, startup will fail elsewhere anyway.
+        pass
@@ -8,7 +8,14 @@ from sqlalchemy.orm import Session, sessionmaker
 from ..core.config import settings
 
 
-engine = create_engine(settings.database_url_sqlalchemy(), pool_pre_ping=True)
+# One engine (and connection pool) per process, shared by the API and the worker threads.
+engine = create_engine(
+    settings.database_url_sqlalchemy(),
+    pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle_seconds,
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
@@ -1,25 +1,68 @@
 from __future__ import annotations
 
-import shutil
+import asyncio
+import json
 import tempfile
+import threading
+from dataclasses import asdict
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from fastapi import BackgroundTasks, Depends, FastAPI, File, Form, UploadFile
+from fastapi import Depends, FastAPI, File, Form, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from .core.config import settings
-from .db.base import Base
-from .db.session import engine
-from sqlalchemy import text
-from .db.session import get_db
-from .services.jobs import create_job, get_job, get_job_result, list_jobs, process_job, save_upload_to_disk, job_to_dict
-from .services.llm import run_llm_on_transcript
-from .services.storage import store_json
-from .services.transcription import transcribe_audio
-
+from .db.schema import ensure_schema
+from .db.session import SessionLocal, engine, get_db
+from .services.audio import transcribe_with_preprocessing_async
+from .services.events import hub
+from .services.executor import analysis_slot, run_blocking, start_executor
+from .services.jobs import (
+    create_job,
+    enqueue_job,
+    get_job,
+    get_job_result,
+    get_job_result_etag,
+    job_events_for,
+    job_queue_counts,
+    job_to_dict,
+    list_jobs,
+    parse_result_fields,
+    retry_job,
+    save_upload,
+    update_job,
+)
+from .services.llm import llm_cache, run_llm_on_transcript_async
+from .services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .services.metrics import jobs_queue, render_metrics, timed
+from .services.objectstore import store_json
+from .services.queue import sweep_stale_jobs
+from .services.reanalysis import (
+    cancel_reanalysis_run,
+    create_reanalysis_run,
+    get_reanalysis_run,
+    run_to_dict,
+)
+from .services.resources import shutdown_resources
+from .services.retention import purge_abandoned_uploads
+from .services.search import search_transcripts
+from .services.storage import COPY_CHUNK_BYTES, copy_and_hash
+from .services.transcription import transcription_cache
+from .services.uploads import (
+    UploadError,
+    UploadOffsetMismatch,
+    commit_chunk,
+    complete_upload,
+    create_upload,
+    get_upload,
+    open_chunk,
+    upload_to_dict,
+)
 
 app = FastAPI(title="Audio → Transcript → LLM Insights", version="0.1.0")
 
@@ -38,50 +81,355 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+def _queue_gauge() -> dict[tuple[str, ...], float]:
+    db = SessionLocal()
+    try:
+        return {(state,): n for state, n in job_queue_counts(db).items()}
+    except Exception:
+        return {}
+    finally:
+        db.close()
+
+
+jobs_queue.set_function(_queue_gauge)
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    if not settings.metrics_enabled:
+        return JSONResponse({"detail": "Metrics are disabled"}, status_code=404)
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/cache/stats")
+def api_cache_stats() -> JSONResponse:
+    return JSONResponse(
+        {
+            "transcription": asdict(transcription_cache().stats()),
+            "llm": asdict(llm_cache().stats()),
+        }
+    )
+
+
 @app.on_event("startup")
 def _startup_create_tables() -> None:
-    # Prototype-friendly: auto-create tables if missing.
-    # In production you would use Alembic migrations.
-    Base.metadata.create_all(bind=engine)
-    # Prototype migration: add new columns if missing.
-    # (Safe for Postgres; no-op if already present.)
-    try:
-        with engine.begin() as conn:
-            conn.execute(text("ALTER TABLE job_results ADD COLUMN IF NOT EXISTS transcript_segments JSONB"))
-            conn.execute(text("ALTER TABLE job_results ADD COLUMN IF NOT EXISTS insights_json JSONB"))
+    ensure_schema(engine)
+    _sweep_stale_jobs()
+    _purge_abandoned_uploads()
+    threading.Thread(target=_upload_gc_loop, name="upload-gc", daemon=True).start()
+    start_executor()
+    hub.start()
+
+
+def _sweep_stale_jobs() -> None:
+    # Workers sweep periodically; once here covers uploads cut off by an API restart.
+    db = SessionLocal()
+    try:
+        sweep_stale_jobs(
+            db,
+            upload_timeout_seconds=settings.job_upload_timeout_seconds,
+            max_attempts=settings.job_max_attempts,
+        )
     except Exception:
-        # If the DB isn't reachable yet, startup will fail elsewhere anyway.
-        pass
+        db.rollback()
+    finally:
+        db.close()
+
+
+_upload_gc_stop = threading.Event()
+
+
+def _purge_abandoned_uploads() -> None:
+    # Partial uploads are on this node's disk, so the API (not the workers) deletes those of
+    # jobs the sweeper failed: at startup, then every RETENTION_GC_INTERVAL_SECONDS.
+    db = SessionLocal()
+    try:
+        purge_abandoned_uploads(db, batch_size=settings.retention_gc_batch_size)
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _upload_gc_loop() -> None:
+    while not _upload_gc_stop.wait(settings.retention_gc_interval_seconds):
+        _purge_abandoned_uploads()
+
+
+@app.on_event("shutdown")
+def _shutdown_resources() -> None:
+    _upload_gc_stop.set()
+    hub.stop()
+    shutdown_resources()
 
 
 @app.post("/api/jobs")
-async def api_create_job(
-    background_tasks: BackgroundTasks,
+def api_create_job(
     db: Session = Depends(get_db),
     audio_file: UploadFile = File(...),
     option_id: str = Form(...),
     source_id: str | None = Form(default=None),
+    priority: str = Form(default="interactive"),
 ) -> JSONResponse:
-    job = create_job(db, file_name=audio_file.filename, option_id=option_id, source_id=source_id)
     try:
-        audio_path = save_upload_to_disk(settings.output_dir, job["id"], audio_file.file, audio_file.filename)
+        job = create_job(
+            db,
+            file_name=audio_file.filename,
+            option_id=option_id,
+            source_id=source_id,
+            priority=priority,
+        )
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    timings: dict[str, float] = {}
+    try:
+        with timed("upload_save", timings):
+            upload = save_upload(
+                settings.output_dir, job["id"], audio_file.file, audio_file.filename
+            )
+    except ValueError as e:
+        update_job(db, job["id"], {"status": "failed", "stage": "failed", "error": str(e)})
+        return JSONResponse({"detail": str(e)}, status_code=413)
     except Exception as e:
+        update_job(db, job["id"], {"status": "failed", "error": f"Failed to save upload: {e}"})
         return JSONResponse({"detail": f"Failed to save upload: {e}"}, status_code=500)
 
-    background_tasks.add_task(
-        process_job,
-        settings.database_url_sqlalchemy(),
-        settings.output_dir,
-        job["id"],
-        audio_path,
-    )
+    # Setting audio_path makes the job claimable by the worker pool (python -m src.app.worker).
+    enqueue_job(db, job["id"], upload, timings=timings)
+    return JSONResponse(job)
+
+
+class CreateUploadRequest(BaseModel):
+    file_name: str | None = None
+    size_bytes: int
+    option_id: str
+    source_id: str | None = None
+    # interactive | bulk (scheduling lane, see services/queue.py)
+    priority: str = "interactive"
+
+
+class CompleteUploadRequest(BaseModel):
+    # Optional end-to-end check of the client's own hash.
+    sha256: str | None = None
+
+
+def _upload_error(e: UploadError) -> JSONResponse:
+    body: dict[str, Any] = {"detail": str(e)}
+    headers: dict[str, str] = {}
+    if isinstance(e, UploadOffsetMismatch):
+        body["offset"] = e.expected
+        headers["Upload-Offset"] = str(e.expected)
+    return JSONResponse(body, status_code=e.status_code, headers=headers)
+
+
+@app.post("/api/uploads")
+def api_create_upload(body: CreateUploadRequest, db: Session = Depends(get_db)) -> JSONResponse:
+    """
+    Start a resumable upload (creates the job in stage `uploading`). Oversize files are
+    rejected here, before any bytes are sent.
+    """
+    try:
+        upload = create_upload(
+            db,
+            settings.output_dir,
+            file_name=body.file_name,
+            size_bytes=body.size_bytes,
+            option_id=body.option_id,
+            source_id=body.source_id,
+            priority=body.priority,
+        )
+    except UploadError as e:
+        return _upload_error(e)
+    return JSONResponse(upload, status_code=201, headers={"Upload-Offset": "0"})
+
+
+@app.get("/api/uploads/{upload_id}")
+def api_get_upload(upload_id: str, db: Session = Depends(get_db)) -> JSONResponse:
+    """
+    Where to resume: `offset` is the number of bytes stored so far.
+    """
+    try:
+        upload = upload_to_dict(get_upload(db, upload_id))
+    except FileNotFoundError:
+        return JSONResponse({"detail": "Upload not found"}, status_code=404)
+    return JSONResponse(upload, headers={"Upload-Offset": str(upload["offset"])})
+
+
+@app.put("/api/uploads/{upload_id}")
+async def api_upload_chunk(upload_id: str, request: Request) -> JSONResponse:
+    """
+    Append one chunk: raw body with `Content-Range: bytes <start>-<end>/<total>`, where start
+    must equal the current offset. The body is streamed to disk; nothing is buffered whole.
+    """
+    db = SessionLocal()
+    try:
+        try:
+            writer = await run_in_threadpool(
+                open_chunk, db, upload_id, request.headers.get("content-range")
+            )
+        except FileNotFoundError:
+            return JSONResponse({"detail": "Upload not found"}, status_code=404)
+        except UploadError as e:
+            return _upload_error(e)
+
+        declared = request.headers.get("content-length")
+        expected = writer.end - writer.start
+        if declared is not None and declared.isdigit() and int(declared) != expected:
+            writer.abort()
+            return JSONResponse(
+                {"detail": "Content-Length does not match Content-Range."}, status_code=400
+            )
+
+        try:
+            buf = bytearray()
+            async for data in request.stream():
+                buf += data
+                if len(buf) >= COPY_CHUNK_BYTES:
+                    await run_in_threadpool(writer.write, bytes(buf))
+                    buf.clear()
+            if buf:
+                await run_in_threadpool(writer.write, bytes(buf))
+            await run_in_threadpool(writer.close)
+        except UploadError as e:
+            writer.abort()
+            return _upload_error(e)
+        except BaseException:
+            # Client went away mid-chunk: the offset stays at the chunk start.
+            writer.abort()
+            raise
+
+        try:
+            upload = await run_in_threadpool(commit_chunk, db, writer)
+        except UploadError as e:
+            return _upload_error(e)
+        return JSONResponse(upload, headers={"Upload-Offset": str(upload["offset"])})
+    finally:
+        db.close()
+
+
+@app.post("/api/uploads/{upload_id}/complete")
+def api_complete_upload(
+    upload_id: str,
+    body: CompleteUploadRequest | None = None,
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    """
+    Finish the upload and queue its job for the workers. Returns the job.
+    """
+    try:
+        job = complete_upload(
+            db, settings.output_dir, upload_id, expected_sha256=body.sha256 if body else None
+        )
+    except FileNotFoundError:
+        return JSONResponse({"detail": "Upload not found"}, status_code=404)
+    except UploadError as e:
+        return _upload_error(e)
     return JSONResponse(job)
 
 
 @app.get("/api/jobs")
-def api_list_jobs(limit: int = 50, offset: int = 0, db: Session = Depends(get_db)) -> JSONResponse:
-    items = list_jobs(db, limit=limit, offset=offset)
-    return JSONResponse({"items": items, "limit": limit, "offset": offset})
+def api_list_jobs(
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    after: str | None = None,
+    status: str | None = None,
+    source_id: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    try:
+        items, next_cursor = list_jobs(
+            db,
+            limit=limit,
+            offset=offset,
+            after=after,
+            status=status,
+            source_id=source_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse(
+        {"items": items, "limit": limit, "offset": offset, "nextCursor": next_cursor}
+    )
+
+
+_TERMINAL_STATUSES = {"completed", "failed"}
+_SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _sse(data: dict[str, Any]) -> str:
+    # Status transitions go out as `job` events, streamed insight sections as `insight` events.
+    event = "insight" if data.get("type") == "insight" else "job"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _job_snapshots(job_ids: list[str]) -> list[dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        return job_events_for(db, job_ids)
+    finally:
+        db.close()
+
+
+async def _job_event_stream(request: Request, job_ids: list[str] | None, close_when_done: bool):
+    # Subscribe before reading the snapshot so no transition can slip in between.
+    sub = hub.subscribe(set(job_ids) if job_ids is not None else None)
+    try:
+        pending = set(job_ids or [])
+        if job_ids:
+            for ev in await run_in_threadpool(_job_snapshots, job_ids):
+                yield _sse(ev)
+                if ev["status"] in _TERMINAL_STATUSES:
+                    pending.discard(ev["jobId"])
+            if close_when_done and not pending:
+                return
+        while not await request.is_disconnected():
+            try:
+                ev = await asyncio.wait_for(sub.queue.get(), timeout=_SSE_KEEPALIVE_SECONDS)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse(ev)
+            if ev.get("status") in _TERMINAL_STATUSES:
+                pending.discard(ev.get("jobId"))
+                if close_when_done and not pending:
+                    return
+    finally:
+        hub.unsubscribe(sub)
+
+
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@app.get("/api/jobs/events")
+async def api_jobs_events(request: Request, ids: str | None = None) -> StreamingResponse:
+    """
+    Server-Sent Events for many jobs: `?ids=a,b,c`, or every job if omitted.
+    """
+    job_ids = [i for i in (ids or "").split(",") if i] or None
+    return StreamingResponse(
+        _job_event_stream(request, job_ids, close_when_done=False),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def api_job_events(job_id: str, request: Request) -> Response:
+    """
+    Server-Sent Events for one job; the stream ends once the job completes or fails.
+    """
+    # Checked up front: an unknown job has no snapshot and would never end the stream.
+    if not await run_in_threadpool(_job_snapshots, [job_id]):
+        return JSONResponse({"detail": "Job not found"}, status_code=404)
+    return StreamingResponse(
+        _job_event_stream(request, [job_id], close_when_done=True),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
 
 
 @app.get("/api/jobs/{job_id}")
@@ -93,30 +441,121 @@ def api_get_job(job_id: str, db: Session = Depends(get_db)) -> JSONResponse:
         return JSONResponse({"detail": "Job not found"}, status_code=404)
 
 
+@app.post("/api/jobs/{job_id}/retry")
+def api_retry_job(job_id: str, db: Session = Depends(get_db)) -> JSONResponse:
+    """
+    Re-queue a failed job; it resumes after its last completed stage (a saved transcript is reused).
+    """
+    try:
+        return JSONResponse(retry_job(db, job_id))
+    except FileNotFoundError:
+        return JSONResponse({"detail": "Job not found"}, status_code=404)
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=409)
+
+
 @app.get("/api/jobs/{job_id}/result")
-def api_get_job_result(job_id: str, db: Session = Depends(get_db)) -> JSONResponse:
+def api_get_job_result(
+    job_id: str,
+    request: Request,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    `?fields=insights,segments` limits the payload (default: everything).
+    Supports If-None-Match: an unchanged result returns 304 without reading the large columns.
+    """
     try:
-        result = get_job_result(db, job_id)
-        return JSONResponse(result)
+        wanted = parse_result_fields(fields)
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+
+    cache_headers = {"Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = get_job_result_etag(db, job_id, wanted)
+        if etag is not None and etag in [t.strip() for t in if_none_match.split(",")]:
+            return Response(status_code=304, headers={"ETag": etag, **cache_headers})
+
+    try:
+        result, etag = get_job_result(db, job_id, wanted)
     except FileNotFoundError:
         return JSONResponse({"detail": "Result not ready"}, status_code=404)
+    return JSONResponse(result, headers={"ETag": etag, **cache_headers})
+
+
+class ReanalyzeRequest(BaseModel):
+    source_id: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    job_ids: list[str] | None = None
+    include_current: bool = False
+    concurrency: int = Field(default=settings.reanalysis_concurrency, ge=1, le=64)
+
+
+@app.post("/api/reanalyze")
+def api_reanalyze(body: ReanalyzeRequest, db: Session = Depends(get_db)) -> JSONResponse:
+    """
+    Re-run the LLM stage over stored transcripts of completed jobs matching the filter (by
+    default only results not on the current prompt version). Runs in the worker pool; poll
+    GET /api/reanalyze/{run_id} for progress.
+    """
+    filters = body.model_dump(exclude={"concurrency"})
+    try:
+        run = create_reanalysis_run(db, filters=filters, concurrency=body.concurrency)
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse(run, status_code=202)
+
+
+@app.get("/api/reanalyze/{run_id}")
+def api_get_reanalysis(run_id: str, db: Session = Depends(get_db)) -> JSONResponse:
+    try:
+        return JSONResponse(run_to_dict(get_reanalysis_run(db, run_id)))
+    except FileNotFoundError:
+        return JSONResponse({"detail": "Run not found"}, status_code=404)
+
+
+@app.post("/api/reanalyze/{run_id}/cancel")
+def api_cancel_reanalysis(run_id: str, db: Session = Depends(get_db)) -> JSONResponse:
+    try:
+        return JSONResponse(cancel_reanalysis_run(db, run_id))
+    except FileNotFoundError:
+        return JSONResponse({"detail": "Run not found"}, status_code=404)
+
+
+@app.get("/api/search")
+def api_search(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    """
+    Full-text search over transcripts; each hit lists the matching segments with start/end times.
+    """
+    return JSONResponse({"q": q, "items": search_transcripts(db, q, limit=limit)})
 
 
 @app.post("/analyze")
 async def analyze(
     audio_file: UploadFile = File(...),
     source_id: str | None = Form(default=None),
+    force: bool = Form(default=False),
 ) -> JSONResponse:
     # Save upload to a temp file so downstream services can read it reliably.
     suffix = Path(audio_file.filename or "").suffix or ".bin"
     try:
-        with tempfile.TemporaryDirectory(prefix="audio_upload_") as tmpdir:
-            tmp_path = str(Path(tmpdir) / f"upload{suffix}")
-            with open(tmp_path, "wb") as out:
-                shutil.copyfileobj(audio_file.file, out)
-
-            tr = transcribe_audio(tmp_path)
-            llm = run_llm_on_transcript(tr.transcript)
+        async with analysis_slot():
+            with tempfile.TemporaryDirectory(prefix="audio_upload_") as tmpdir:
+                tmp_path = str(Path(tmpdir) / f"upload{suffix}")
+                upload = await run_blocking(
+                    copy_and_hash, audio_file.file, tmp_path, max_bytes=settings.max_upload_bytes
+                )
+
+                tr, prep_stats = await transcribe_with_preprocessing_async(
+                    tmp_path, audio_sha256=upload.sha256
+                )
+                llm = await run_llm_on_transcript_async(tr.transcript, use_cache=not force)
     except ValueError as e:
         # e.g. file too large, invalid parameters, etc.
         return JSONResponse({"detail": str(e)}, status_code=413)
@@ -129,17 +568,22 @@ async def analyze(
         "transcription": {
             "provider": tr.provider,
             "model": tr.model,
+            "cached": tr.cached,
+            "preprocess": prep_stats,
         },
         "llm": {
             "provider": llm.provider,
             "model": llm.model,
+            "strategy": llm.strategy,
+            "stages": llm.stages,
+            "cached": llm.cached,
         },
         "transcript": tr.transcript,
         "insights_raw": llm.raw_text,
         "insights_json": llm.parsed_json,
     }
 
-    stored = store_json(settings.output_dir, payload)
+    stored = await run_blocking(store_json, settings.output_dir, payload)
 
     return JSONResponse(
         {
@@ -152,9 +596,10 @@ async def analyze(
 
 
 @app.post("/analyze-from-file")
-def analyze_from_file(
+async def analyze_from_file(
     file_name: str = Form(...),
     source_id: str | None = Form(default=None),
+    force: bool = Form(default=False),
 ) -> JSONResponse:
     """
     Analyze an audio file that already exists on disk under settings.data_dir.
@@ -175,8 +620,9 @@ def analyze_from_file(
         )
 
     try:
-        tr = transcribe_audio(str(audio_path))
-        llm = run_llm_on_transcript(tr.transcript)
+        async with analysis_slot():
+            tr, prep_stats = await transcribe_with_preprocessing_async(str(audio_path))
+            llm = await run_llm_on_transcript_async(tr.transcript, use_cache=not force)
     except ValueError as e:
         return JSONResponse({"detail": str(e)}, status_code=413)
     except Exception as e:
@@ -189,17 +635,22 @@ def analyze_from_file(
         "transcription": {
             "provider": tr.provider,
             "model": tr.model,
+            "cached": tr.cached,
+            "preprocess": prep_stats,
         },
         "llm": {
             "provider": llm.provider,
             "model": llm.model,
+            "strategy": llm.strategy,
+            "stages": llm.stages,
+            "cached": llm.cached,
         },
         "transcript": tr.transcript,
         "insights_raw": llm.raw_text,
         "insights_json": llm.parsed_json,
     }
 
-    stored = store_json(settings.output_dir, payload)
+    stored = await run_blocking(store_json, settings.output_dir, payload)
 
     return JSONResponse(
         {
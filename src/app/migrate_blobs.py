@@ -0,0 +1,85 @@
+"""
+Move large inline result values (transcript, segments, deliverable) into the compressed
+`blobs` table, optionally measuring row size and read latency before and after.
+
+    python -m src.app.migrate_blobs --benchmark
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from .db.models import JobResult
+from .db.schema import ensure_schema
+from .db.session import SessionLocal, engine
+from .services.jobs import externalize_inline_results, get_job_result
+
+
+def _benchmark(sample: int) -> dict[str, float]:
+    db = SessionLocal()
+    try:
+        avg_row = db.execute(text("SELECT avg(pg_column_size(r.*)) FROM job_results r")).scalar()
+        total = db.execute(text("SELECT pg_total_relation_size('job_results')")).scalar()
+        ids = db.execute(select(JobResult.job_id).limit(sample)).scalars().all()
+        timings: list[float] = []
+        for job_id in ids:
+            t0 = time.perf_counter()
+            get_job_result(db, job_id)
+            timings.append((time.perf_counter() - t0) * 1000)
+        return {
+            "rows_sampled": float(len(ids)),
+            "avg_row_bytes": float(avg_row or 0),
+            "job_results_total_bytes": float(total or 0),
+            "read_p50_ms": statistics.median(timings) if timings else 0.0,
+            "read_max_ms": max(timings) if timings else 0.0,
+        }
+    finally:
+        db.close()
+
+
+def _print(label: str, stats: dict[str, float]) -> None:
+    print(label)
+    for k, v in stats.items():
+        print(f"  {k:>24}: {v:,.2f}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Externalize large job_results values to blobs.")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--benchmark", action="store_true", help="Measure before/after.")
+    parser.add_argument(
+        "--sample", type=int, default=200, help="Results to read when benchmarking."
+    )
+    args = parser.parse_args(argv)
+
+    ensure_schema(engine)
+    if args.benchmark:
+        _print("before", _benchmark(args.sample))
+
+    moved = 0
+    after: str | None = None
+    while True:
+        db = SessionLocal()
+        try:
+            n, after = externalize_inline_results(db, batch_size=args.batch_size, after=after)
+        finally:
+            db.close()
+        moved += n
+        if after is None:
+            break
+        print(f"migrated {moved} result(s)...")
+    print(f"done: {moved} result(s) migrated")
+
+    if args.benchmark:
+        # Reclaim the space held by the old inline values so row sizes reflect the new layout.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM (ANALYZE) job_results")
+        _print("after", _benchmark(args.sample))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Re-run the LLM stage over stored transcripts (e.g. after editing the prompts in services/llm.py).
+
+    python -m src.app.reanalyze                       # every result not on the current prompt
+    python -m src.app.reanalyze --source-id acme --created-from 2024-01-01 --concurrency 8
+    python -m src.app.reanalyze --resume rr_...       # continue an interrupted run
+
+Ctrl-C stops after the in-flight jobs; the run can be resumed with --resume (or by a worker).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+
+from .core.config import settings
+from .db.schema import ensure_schema
+from .db.session import SessionLocal, engine
+from .services.reanalysis import (
+    claim_reanalysis_run,
+    create_reanalysis_run,
+    execute_reanalysis_run,
+)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Re-run insights over stored transcripts.")
+    parser.add_argument("--source-id")
+    parser.add_argument("--created-from", help="ISO 8601")
+    parser.add_argument("--created-to", help="ISO 8601")
+    parser.add_argument("--job-id", action="append", dest="job_ids", help="Repeatable.")
+    parser.add_argument(
+        "--include-current",
+        action="store_true",
+        help="Also redo results already generated with the current prompt version.",
+    )
+    parser.add_argument("--concurrency", type=int, default=settings.reanalysis_concurrency)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--resume", metavar="RUN_ID", help="Continue an existing run.")
+    args = parser.parse_args(argv)
+
+    ensure_schema(engine)
+    db = SessionLocal()
+    try:
+        if args.resume:
+            run_id = args.resume
+        else:
+            run = create_reanalysis_run(
+                db,
+                filters={
+                    "source_id": args.source_id,
+                    "created_from": args.created_from,
+                    "created_to": args.created_to,
+                    "job_ids": args.job_ids,
+                    "include_current": args.include_current,
+                },
+                concurrency=args.concurrency,
+            )
+            run_id = run["id"]
+            print(
+                f"run {run_id}: {run['total']} result(s) to re-analyze "
+                f"(prompt {run['promptVersion']})"
+            )
+        worker_id = f"cli:{socket.gethostname()}:{os.getpid()}"
+        claimed = claim_reanalysis_run(
+            db, worker_id=worker_id, lease_seconds=settings.job_lease_seconds, run_id=run_id
+        )
+    finally:
+        db.close()
+    if claimed is None:
+        sys.exit(f"run {run_id} is finished, cancelled, unknown, or leased by another process")
+
+    stop = threading.Event()
+
+    def _on_signal(signum, _frame) -> None:
+        print("\nstopping after in-flight jobs...", flush=True)
+        stop.set()
+
+    signal.signal(signal.SIGINT, _on_signal)
+    signal.signal(signal.SIGTERM, _on_signal)
+
+    def _progress(run: dict) -> None:
+        finished = run["done"] + run["failed"]
+        print(f"\r{finished}/{run['total']} ({run['failed']} failed)", end="", flush=True)
+
+    status = execute_reanalysis_run(
+        run_id,
+        worker_id=worker_id,
+        lease_seconds=settings.job_lease_seconds,
+        batch_size=args.batch_size,
+        on_progress=_progress,
+        stop=stop,
+    )
+    print()
+    if status == "running":
+        print(f"interrupted; resume with: python -m src.app.reanalyze --resume {run_id}")
+    else:
+        print(f"run {run_id}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Build the full-text search index for results stored before search existed.
+
+    python -m src.app.reindex_search
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from .db.schema import ensure_schema
+from .db.session import SessionLocal, engine
+from .services.jobs import backfill_search_index
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Index existing transcripts for /api/search.")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    ensure_schema(engine)
+    indexed = 0
+    while True:
+        db = SessionLocal()
+        try:
+            n = backfill_search_index(db, batch_size=args.batch_size)
+        finally:
+            db.close()
+        if n == 0:
+            break
+        indexed += n
+        print(f"indexed {indexed} result(s)...")
+    print(f"done: {indexed} result(s) indexed")
+
+
+if __name__ == "__main__":
+    main()
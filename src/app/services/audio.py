@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from ..core.config import settings
+from .cache import cache_key
+from .executor import run_blocking
+from .storage import sha256_file
+from .transcription import (
+    TranscriptionResult,
+    WindowCallback,
+    get_transcription_provider,
+    probe_duration_seconds,
+    transcribe_audio,
+    transcription_cache,
+    transcription_from_cache,
+    transcription_providers,
+)
+
+
+@dataclass(frozen=True)
+class PreprocessStats:
+    original_bytes: int
+    processed_bytes: int
+    original_seconds: float | None
+    processed_seconds: float | None
+    leading_trim_seconds: float
+    # Audio the provider no longer has to upload and transcribe (trimmed silence).
+    saved_seconds: float | None
+    saved_bytes: int
+    preprocess_seconds: float
+
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def preprocessing_available() -> bool:
+    # Resolved per call so installing ffmpeg doesn't need a config change.
+    return settings.audio_preprocess_enabled and shutil.which(settings.ffmpeg_binary) is not None
+
+
+def detect_edge_silence(file_path: str, duration: float | None) -> tuple[float, float | None]:
+    """
+    Return (leading_silence_seconds, trailing_silence_start or None) using ffmpeg silencedetect.
+    """
+    proc = subprocess.run(
+        [
+            settings.ffmpeg_binary,
+            "-nostdin",
+            "-hide_banner",
+            "-i",
+            file_path,
+            "-af",
+            f"silencedetect=n={settings.audio_silence_threshold_db}dB"
+            f":d={settings.audio_silence_min_seconds}",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    starts = [float(m) for m in _SILENCE_START.findall(proc.stderr)]
+    ends = [float(m) for m in _SILENCE_END.findall(proc.stderr)]
+
+    leading = 0.0
+    if starts and ends and starts[0] <= 0.05:
+        leading = max(0.0, ends[0])
+    trailing_start = None
+    # A silence that starts but never ends runs to the end of the file.
+    if len(starts) > len(ends):
+        trailing_start = starts[-1]
+    elif starts and ends and duration is not None and duration - ends[-1] < 0.05:
+        trailing_start = starts[-1]
+    if trailing_start is not None and trailing_start <= leading:
+        trailing_start = None
+    return leading, trailing_start
+
+
+def preprocess_audio(file_path: str, out_dir: str) -> tuple[str, PreprocessStats]:
+    """
+    Downmix to mono, resample (AUDIO_PREPROCESS_SAMPLE_RATE) and re-encode as low-bitrate Opus,
+    optionally trimming leading/trailing silence. Returns (processed_path, stats).
+    """
+    t0 = time.perf_counter()
+    src = Path(file_path)
+    original_seconds = probe_duration_seconds(str(src))
+
+    leading, trailing_start = 0.0, None
+    if settings.audio_trim_silence:
+        leading, trailing_start = detect_edge_silence(str(src), original_seconds)
+
+    out_path = str(Path(out_dir) / f"{src.stem}.prepared.ogg")
+    cmd = [settings.ffmpeg_binary, "-nostdin", "-loglevel", "error", "-y"]
+    if leading > 0:
+        cmd += ["-ss", f"{leading:.3f}"]
+    cmd += ["-i", str(src)]
+    if trailing_start is not None:
+        cmd += ["-t", f"{trailing_start - leading:.3f}"]
+    cmd += [
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(settings.audio_preprocess_sample_rate),
+        "-c:a",
+        "libopus",
+        "-b:a",
+        settings.audio_preprocess_bitrate,
+        "-application",
+        "voip",
+        out_path,
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+    original_bytes = src.stat().st_size
+    processed_bytes = Path(out_path).stat().st_size
+    processed_seconds = probe_duration_seconds(out_path)
+    saved_seconds = None
+    if original_seconds is not None and processed_seconds is not None:
+        saved_seconds = round(max(0.0, original_seconds - processed_seconds), 3)
+    stats = PreprocessStats(
+        original_bytes=original_bytes,
+        processed_bytes=processed_bytes,
+        original_seconds=original_seconds,
+        processed_seconds=processed_seconds,
+        leading_trim_seconds=round(leading, 3),
+        saved_seconds=saved_seconds,
+        saved_bytes=original_bytes - processed_bytes,
+        preprocess_seconds=round(time.perf_counter() - t0, 3),
+    )
+    return out_path, stats
+
+
+def _shift_segments(tr: TranscriptionResult, offset: float) -> TranscriptionResult:
+    if not offset or not tr.segments:
+        return tr
+    shifted = [
+        {
+            **s,
+            "start": s["start"] + offset if s.get("start") is not None else None,
+            "end": s["end"] + offset if s.get("end") is not None else None,
+        }
+        for s in tr.segments
+    ]
+    return replace(tr, segments=shifted)
+
+
+def _prepared_cache_key(audio_sha256: str, model: str) -> str:
+    # The original upload's hash plus every setting the prepared audio depends on. (Hashing the
+    # encoded file would need ffmpeg first, and its output is not byte-for-byte reproducible.)
+    return cache_key(
+        "transcription",
+        audio_sha256,
+        model,
+        "preprocessed",
+        str(settings.audio_preprocess_sample_rate),
+        settings.audio_preprocess_bitrate,
+        str(settings.audio_trim_silence),
+        str(settings.audio_silence_threshold_db),
+        str(settings.audio_silence_min_seconds),
+    )
+
+
+def transcribe_with_preprocessing(
+    file_path: str,
+    *,
+    audio_sha256: str | None = None,
+    on_window: WindowCallback | None = None,
+) -> tuple[TranscriptionResult, dict[str, Any] | None]:
+    """
+    Pipeline stage between the saved upload and transcription.
+
+    When ffmpeg is available and AUDIO_PREPROCESS_ENABLED is set, the upload is converted to a
+    small mono speech file first and that is transcribed instead; segment timestamps are mapped
+    back to the original recording. Returns (transcription, preprocess stats or None).
+    on_window is passed through to transcribe_audio.
+
+    Results are cached by (upload SHA-256, model, preprocessing settings) together with their
+    stats, and the cache is checked before ffmpeg runs; a hit returns the stats of the run that
+    filled it, with "cached": true.
+    """
+    if get_transcription_provider().name == "stub" or not preprocessing_available():
+        return transcribe_audio(file_path, audio_sha256=audio_sha256, on_window=on_window), None
+
+    cache = transcription_cache() if settings.transcription_cache_enabled else None
+    digest = (audio_sha256 or sha256_file(file_path)) if cache is not None else ""
+    if cache is not None:
+        for provider in transcription_providers():
+            hit = cache.get(_prepared_cache_key(digest, provider.model))
+            if hit is not None:
+                return transcription_from_cache(hit, provider), {
+                    **(hit.get("preprocess") or {}),
+                    "cached": True,
+                }
+
+    with tempfile.TemporaryDirectory(prefix="audio_prep_") as tmpdir:
+        try:
+            prepared, stats = preprocess_audio(file_path, tmpdir)
+        except (subprocess.SubprocessError, OSError):
+            # Unreadable by ffmpeg: let the provider try the original file.
+            return transcribe_audio(file_path, audio_sha256=audio_sha256, on_window=on_window), None
+        t0 = time.perf_counter()
+        tr = transcribe_audio(prepared, on_window=on_window, use_cache=False)
+        transcribe_seconds = round(time.perf_counter() - t0, 3)
+    tr = _shift_segments(tr, stats.leading_trim_seconds)
+    prep_stats = {**asdict(stats), "transcribe_seconds": transcribe_seconds}
+    if cache is not None and tr.provider != "stub":
+        cache.put(_prepared_cache_key(digest, tr.model), {**asdict(tr), "preprocess": prep_stats})
+    return tr, prep_stats
+
+
+async def transcribe_with_preprocessing_async(
+    file_path: str, *, audio_sha256: str | None = None
+) -> tuple[TranscriptionResult, dict[str, Any] | None]:
+    return await run_blocking(transcribe_with_preprocessing, file_path, audio_sha256=audio_sha256)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..db.models import Blob, JobResult
+
+try:  # Optional: zstd is faster and smaller; zlib is the stdlib fallback.
+    import zstandard
+
+    _ZSTD_C = zstandard.ZstdCompressor(level=3)
+    _ZSTD_D = zstandard.ZstdDecompressor()
+except Exception:  # pragma: no cover - depends on environment
+    zstandard = None
+
+
+def _compress(data: bytes) -> tuple[str, bytes]:
+    if zstandard is not None:
+        return "zstd", _ZSTD_C.compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed")
+        return _ZSTD_D.decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def put_blob(db: Session, data: bytes) -> str:
+    """
+    Store bytes content-addressed (SHA-256 of the raw bytes); identical content is stored once.
+    Returns the hash. The caller commits.
+
+    Storing existing content again refreshes its created_at and row-locks it until the caller
+    commits, so purge_unreferenced_blobs() cannot delete a blob that is about to be referenced.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    codec, packed = _compress(data)
+    now = datetime.now(UTC)
+    db.execute(
+        insert(Blob)
+        .values(
+            hash=digest,
+            codec=codec,
+            size_bytes=len(data),
+            stored_bytes=len(packed),
+            data=packed,
+            created_at=now,
+        )
+        .on_conflict_do_update(index_elements=[Blob.hash], set_={"created_at": now})
+    )
+    return digest
+
+
+def get_blobs(db: Session, hashes: list[str]) -> dict[str, bytes]:
+    """
+    Fetch and decompress several blobs in one query.
+    """
+    wanted = [h for h in dict.fromkeys(hashes) if h]
+    if not wanted:
+        return {}
+    rows = db.execute(select(Blob.hash, Blob.codec, Blob.data).where(Blob.hash.in_(wanted))).all()
+    return {r.hash: _decompress(r.codec, bytes(r.data)) for r in rows}
+
+
+def purge_unreferenced_blobs(db: Session, *, written_before: datetime, batch_size: int) -> int:
+    """
+    Delete up to batch_size blobs no result row references any more (e.g. the deliverable an
+    overwrite or re-analysis replaced), among those last written before written_before.
+    Commits; safe to run from several processes.
+    """
+    orphans = (
+        select(Blob.hash)
+        .where(
+            Blob.created_at < written_before,
+            ~exists().where(JobResult.transcript_blob == Blob.hash),
+            ~exists().where(JobResult.segments_blob == Blob.hash),
+            ~exists().where(JobResult.deliverable_blob == Blob.hash),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    hashes = db.execute(orphans).scalars().all()
+    if hashes:
+        db.execute(delete(Blob).where(Blob.hash.in_(hashes)))
+    db.commit()
+    return len(hashes)
+
+
+def put_text(db: Session, value: str) -> str:
+    return put_blob(db, value.encode("utf-8"))
+
+
+def put_json(db: Session, value: Any) -> str:
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return put_blob(db, data.encode("utf-8"))
+
+
+def decode_text(data: bytes) -> str:
+    return data.decode("utf-8")
+
+
+def decode_json(data: bytes) -> Any:
+    return json.loads(data.decode("utf-8"))
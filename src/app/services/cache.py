@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .storage import write_json_file
+
+logger = logging.getLogger("app.cache")
+
+
+def cache_key(*parts: str) -> str:
+    """
+    Stable content key for a tuple of strings (order-sensitive, unambiguous).
+    """
+    h = hashlib.sha256()
+    for p in parts:
+        b = p.encode("utf-8")
+        h.update(len(b).to_bytes(8, "big"))
+        h.update(b)
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    writes: int
+    evictions: int
+    size_bytes: int
+
+
+class JsonDiskCache:
+    """
+    Small content-addressed JSON cache on local disk.
+
+    Entries live at <root>/<key[:2]>/<key>.json. Reads refresh the file atime, so eviction
+    (oldest atime first, once the directory exceeds max_bytes) behaves like LRU. The mtime is
+    the write time: entries written more than ttl_seconds ago (if set) are treated as misses
+    and removed, however often they are read.
+    """
+
+    def __init__(self, root: str, *, max_bytes: int, ttl_seconds: float | None = None) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._size_bytes: int | None = None
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            st = path.stat()
+            if self.ttl_seconds is not None and time.time() - st.st_mtime > self.ttl_seconds:
+                self._remove(path, st.st_size)
+                raise FileNotFoundError(path)
+            with open(path, encoding="utf-8") as f:
+                val = json.load(f)
+            # Only the access time: mtime must keep the write time for the TTL.
+            os.utime(path, (time.time(), st.st_mtime))
+        except (OSError, ValueError):
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return val if isinstance(val, dict) else None
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """
+        Best effort: a write that fails (full disk, permissions, or a value that can't be
+        stored, such as model output with unpaired surrogates) is logged and dropped, so a
+        result that was already paid for is never lost to its cache entry.
+        """
+        path = self._path(key)
+        try:
+            old_size = path.stat().st_size if path.exists() else 0
+            write_json_file(str(path), value)
+            new_size = path.stat().st_size
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("cache write failed for %s: %s", key, e)
+            return
+        with self._lock:
+            self._writes += 1
+            if self._size_bytes is not None:
+                self._size_bytes += new_size - old_size
+        if self._current_size() > self.max_bytes:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        if path.exists():
+            self._remove(path, path.stat().st_size)
+
+    def evict(self) -> int:
+        """
+        Remove least-recently-used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total = 0
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        removed = 0
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size_bytes = total
+            self._evictions += removed
+        return removed
+
+    def stats(self) -> CacheStats:
+        size = self._current_size()
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                writes=self._writes,
+                evictions=self._evictions,
+                size_bytes=size,
+            )
+
+    def _current_size(self) -> int:
+        with self._lock:
+            if self._size_bytes is not None:
+                return self._size_bytes
+        total = sum(p.stat().st_size for p in self.root.glob("*/*.json") if p.is_file())
+        with self._lock:
+            self._size_bytes = total
+        return total
+
+    def _remove(self, path: Path, size: int) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._evictions += 1
+            if self._size_bytes is not None:
+                self._size_bytes -= size
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+import psycopg
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..db.session import engine
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_CHANNEL = "job_events"
+
+# Postgres NOTIFY payloads must stay under 8000 bytes.
+_MAX_ERROR_CHARS = 1000
+_MAX_PAYLOAD_BYTES = 7900
+
+
+def publish_insight_section(job_id: str, key: str, value: Any) -> None:
+    """
+    Publish one completed insights section for a job (outside any job transaction).
+
+    Sections too large for a NOTIFY payload are announced without their value; clients
+    then pick them up from the final result.
+    """
+    payload = {"jobId": job_id, "type": "insight", "key": key, "value": value}
+    if len(json.dumps(payload, ensure_ascii=False).encode("utf-8")) > _MAX_PAYLOAD_BYTES:
+        payload = {"jobId": job_id, "type": "insight", "key": key, "truncated": True}
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": JOB_EVENTS_CHANNEL, "payload": json.dumps(payload, ensure_ascii=False)},
+            )
+    except Exception:
+        # Live previews are best-effort; never fail the job over them.
+        logger.exception("failed to publish insight section %s for %s", key, job_id)
+
+
+def notify_job_event(db: Session, payload: dict[str, Any]) -> None:
+    """
+    Queue a job event on the current transaction; Postgres delivers it on commit.
+    """
+    body = dict(payload)
+    if isinstance(body.get("error"), str):
+        body["error"] = body["error"][:_MAX_ERROR_CHARS]
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": JOB_EVENTS_CHANNEL, "payload": json.dumps(body, ensure_ascii=False)},
+    )
+
+
+@dataclass(eq=False)
+class Subscription:
+    job_ids: frozenset[str] | None  # None = all jobs
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=256))
+
+
+class JobEventHub:
+    """
+    One LISTEN connection per process, fanned out to any number of SSE subscribers.
+
+    A background thread blocks on Postgres notifications and hands each event to the
+    subscribers' asyncio queues, so open event streams cost no database reads.
+    """
+
+    def __init__(self) -> None:
+        self._subs: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="job-events", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def subscribe(self, job_ids: set[str] | None) -> Subscription:
+        sub = Subscription(
+            job_ids=frozenset(job_ids) if job_ids is not None else None,
+            loop=asyncio.get_running_loop(),
+        )
+        with self._lock:
+            self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+    def _dispatch(self, event: dict[str, Any]) -> None:
+        job_id = event.get("jobId")
+        with self._lock:
+            targets = [s for s in self._subs if s.job_ids is None or job_id in s.job_ids]
+        for sub in targets:
+            sub.loop.call_soon_threadsafe(_offer, sub.queue, event)
+
+    def _listen_forever(self) -> None:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(dsn, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {JOB_EVENTS_CHANNEL}")
+                    while not self._stop.is_set():
+                        for n in conn.notifies(timeout=5.0):
+                            try:
+                                event = json.loads(n.payload)
+                            except ValueError:
+                                continue
+                            if isinstance(event, dict):
+                                self._dispatch(event)
+            except Exception:
+                logger.exception("job event listener failed; reconnecting")
+                self._stop.wait(2.0)
+
+
+def _offer(queue: asyncio.Queue, event: dict[str, Any]) -> None:
+    # A subscriber that stopped reading must not block everyone else; drop its oldest event.
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(event)
+
+
+hub = JobEventHub()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from ..core.config import settings
+
+T = TypeVar("T")
+
+# Blocking provider work (sync OpenAI client, ffmpeg, file hashing) runs here, off the event loop.
+# Created on app startup (or first use) and dropped on shutdown, so a second startup in the same
+# process gets a fresh pool.
+_executor: ThreadPoolExecutor | None = None
+# Caps how many analyses are in flight at once per process; extra requests wait their turn.
+# Bound to the event loop it is first used on, so it is recreated along with the pool.
+_semaphore: asyncio.Semaphore | None = None
+
+
+def start_executor() -> None:
+    global _executor, _semaphore
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.provider_max_threads, thread_name_prefix="provider"
+        )
+        _semaphore = asyncio.Semaphore(settings.analyze_max_concurrency)
+
+
+@asynccontextmanager
+async def analysis_slot() -> AsyncIterator[None]:
+    """
+    Hold one of ANALYZE_MAX_CONCURRENCY slots for a whole analysis (all of its blocking calls).
+    """
+    start_executor()
+    assert _semaphore is not None
+    async with _semaphore:
+        yield
+
+
+async def run_blocking(fn: Callable[..., T], /, *args, **kwargs) -> T:
+    """
+    Run a blocking call on the provider thread pool without blocking the event loop.
+    """
+    start_executor()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    global _executor, _semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _semaphore = None
@@ -1,25 +1,32 @@
 from __future__ import annotations
 
-import shutil
-from datetime import datetime, timezone
+import base64
+import json
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import Text, and_, cast, func, or_, select, tuple_
 from sqlalchemy.orm import Session
 
+from ..core.config import settings
 from ..db.models import Job, JobResult
-from .llm import run_llm_on_transcript
-from .transcription import transcribe_audio
+from ..db.session import SessionLocal
+from .audio import transcribe_with_preprocessing
+from .blobs import decode_json, decode_text, get_blobs, put_json, put_text
+from .events import notify_job_event, publish_insight_section
+from .llm import InsightPipeline, LLMResult, run_llm_on_transcript
+from .metrics import jobs_finished_total, jobs_in_flight, stage_seconds, timed
+from .objectstore import local_file, put_stream, sharded_key
+from .queue import PRIORITIES, upload_saved
+from .search import index_result_for_search
+from .storage import SavedUpload
+from .transcription import TranscriptionResult
 
 
 def _now_iso_utc() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
-def _uploads_dir(output_dir: str) -> Path:
-    return Path(output_dir) / "uploads"
+    return datetime.now(UTC).isoformat()
 
 
 def create_job(
@@ -28,17 +35,22 @@ def create_job(
     file_name: str | None,
     option_id: str,
     source_id: str | None,
+    priority: str = "interactive",
 ) -> dict[str, Any]:
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of: {', '.join(PRIORITIES)}.")
     job_id = f"job_{uuid4().hex}"
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     row = Job(
         id=job_id,
         created_at=now,
         file_name=file_name,
         option_id=option_id,
         status="processing",
+        stage="uploading",
         duration=None,
         source_id=source_id,
+        priority=priority,
         error=None,
         audio_path=None,
     )
@@ -47,13 +59,51 @@ def create_job(
     return job_to_dict(row)
 
 
-def save_upload_to_disk(output_dir: str, job_id: str, src_file, original_name: str | None) -> str:
+def upload_key(job_id: str, original_name: str | None, when: datetime) -> str:
+    """
+    Object key for a job's recording, sharded by upload day (see objectstore.sharded_key).
+    """
     suffix = Path(original_name or "").suffix or ".bin"
-    upload_path = _uploads_dir(output_dir) / f"{job_id}{suffix}"
-    upload_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(upload_path, "wb") as out:
-        shutil.copyfileobj(src_file, out)
-    return str(upload_path)
+    return sharded_key("uploads", when, job_id, f"{job_id}{suffix}")
+
+
+def upload_path_for(output_dir: str, key: str) -> str:
+    """
+    Local path for an upload key (where resumable uploads are assembled before publishing).
+    """
+    return str(Path(output_dir) / key)
+
+
+def save_upload(output_dir: str, job_id: str, src_file, original_name: str | None) -> SavedUpload:
+    """
+    Stream an upload into the object store (STORAGE_BACKEND); SavedUpload.path is its ref.
+    """
+    return put_stream(
+        output_dir,
+        upload_key(job_id, original_name, datetime.now(UTC)),
+        src_file,
+        max_bytes=settings.max_upload_bytes,
+    )
+
+
+def enqueue_job(
+    db: Session, job_id: str, upload: SavedUpload, *, timings: dict[str, float] | None = None
+) -> None:
+    """
+    Hand a job to the worker pool. Workers only claim jobs whose upload is stored.
+    """
+    update_job(
+        db,
+        job_id,
+        {
+            "audioPath": upload.path,
+            "audioSha256": upload.sha256,
+            "status": "processing",
+            "stage": "uploaded",
+            "error": None,
+            "stageTimings": timings,
+        },
+    )
 
 
 def get_job(db: Session, job_id: str) -> Job:
@@ -63,10 +113,84 @@ def get_job(db: Session, job_id: str) -> Job:
     return row
 
 
-def list_jobs(db: Session, *, limit: int = 50, offset: int = 0) -> list[dict[str, Any]]:
-    stmt = select(Job).order_by(Job.created_at.desc()).limit(limit).offset(offset)
-    rows = db.execute(stmt).scalars().all()
-    return [job_to_dict(r) for r in rows]
+# Only what job_to_dict needs; keeps list queries off the wide/queue columns.
+_JOB_LIST_COLUMNS = (
+    Job.id,
+    Job.created_at,
+    Job.file_name,
+    Job.option_id,
+    Job.status,
+    Job.stage,
+    Job.duration,
+    Job.source_id,
+    Job.priority,
+    Job.error,
+    Job.stage_timings,
+)
+
+
+def encode_job_cursor(created_at: datetime, job_id: str) -> str:
+    """
+    Opaque, URL-safe cursor (base64url without padding): an ISO timestamp's "+00:00" would
+    otherwise decode to a space when a client puts the cursor in a query string unencoded.
+    """
+    raw = f"{created_at.isoformat()},{job_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_job_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor (use nextCursor from the previous page).") from e
+    ts, sep, job_id = raw.rpartition(",")
+    if not sep or not job_id:
+        raise ValueError("Invalid cursor (use nextCursor from the previous page).")
+    try:
+        created_at = datetime.fromisoformat(ts)
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor timestamp: {ts!r}") from e
+    return created_at, job_id
+
+
+def list_jobs(
+    db: Session,
+    *,
+    limit: int = 50,
+    offset: int = 0,
+    after: str | None = None,
+    status: str | None = None,
+    source_id: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Newest-first job listing. Returns (items, next_cursor).
+
+    Prefer `after` (keyset pagination on (created_at, id), served by ix_jobs_created_at_id)
+    over `offset`, which gets slower the deeper you page.
+    """
+    stmt = select(*_JOB_LIST_COLUMNS)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    if source_id:
+        stmt = stmt.where(Job.source_id == source_id)
+    if created_from:
+        stmt = stmt.where(Job.created_at >= created_from)
+    if created_to:
+        stmt = stmt.where(Job.created_at < created_to)
+    if after:
+        cursor_ts, cursor_id = decode_job_cursor(after)
+        stmt = stmt.where(tuple_(Job.created_at, Job.id) < tuple_(cursor_ts, cursor_id))
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    stmt = stmt.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_job_cursor(rows[-1].created_at, rows[-1].id) if has_more and rows else None
+    return [job_to_dict(r) for r in rows], next_cursor
 
 
 def update_job(db: Session, job_id: str, patch: dict[str, Any]) -> None:
@@ -82,93 +206,505 @@ def update_job(db: Session, job_id: str, patch: dict[str, Any]) -> None:
             row.source_id = v
         elif k == "status":
             row.status = v
+            # Retention (services/retention.py) counts from when a job last finished.
+            row.finished_at = (
+                datetime.now(UTC) if v in ("completed", "failed") else None
+            )
+        elif k == "stage":
+            row.stage = v
         elif k == "duration":
             row.duration = v
         elif k == "error":
             row.error = v
         elif k == "audioPath":
             row.audio_path = v
+        elif k == "audioSha256":
+            row.audio_sha256 = v
+        elif k == "stageTimings":
+            row.stage_timings = v
+        elif k == "preprocessStats":
+            row.preprocess_stats = v
+    if {"status", "stage", "error"} & patch.keys():
+        # Delivered to SSE subscribers (services/events.py) when this transaction commits.
+        notify_job_event(db, job_event(row))
     db.commit()
 
 
-def process_job(database_url: str, output_dir: str, job_id: str, audio_path: str) -> None:
+def format_duration(seconds: float | None) -> str | None:
+    """
+    Recording length for Job.duration, e.g. "4:05" or "1:02:09".
     """
-    Background task: transcribe -> LLM -> save result -> update job status.
+    if seconds is None or seconds < 0:
+        return None
+    total = int(round(seconds))
+    h, rem = divmod(total, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def _recording_seconds(
+    prep_stats: dict[str, Any] | None, segments: list[dict] | None
+) -> float | None:
+    if prep_stats and prep_stats.get("original_seconds") is not None:
+        return prep_stats["original_seconds"]
+    ends = [s["end"] for s in segments or [] if s.get("end") is not None]
+    return max(ends) if ends else None
+
+
+def process_job(output_dir: str, job_id: str, audio_path: str) -> None:
     """
-    # Import locally so the background task doesn't rely on FastAPI dependency injection.
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
+    Worker task: transcribe -> LLM -> save result -> update job status.
 
-    engine = create_engine(database_url, pool_pre_ping=True)
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    The transcript is saved as soon as transcription finishes; if this job already has one
+    (an earlier attempt failed later, or it was re-queued with retry_job), transcription is
+    skipped and only the LLM stage runs. For long recordings the LLM map step runs during
+    transcription (InsightPipeline), so the "llm" timing is only what is left after it.
+    Per-stage seconds are kept in Job.stage_timings and observed into the
+    insightrelay_stage_seconds histogram (services/metrics.py).
+    """
+    # Uses the process-wide engine/pool, not FastAPI dependency injection.
     db: Session = SessionLocal()
+    jobs_in_flight.inc()
     try:
-        update_job(db, job_id, {"audioPath": audio_path, "status": "processing", "error": None})
-        tr = transcribe_audio(audio_path)
-        llm = run_llm_on_transcript(tr.transcript)
-
-        existing = db.get(JobResult, job_id)
-        now = datetime.now(timezone.utc)
-        if existing:
-            existing.created_at = now
-            existing.transcript = tr.transcript
-            existing.transcript_segments = tr.segments
-            existing.deliverable = llm.raw_text
-            existing.insights_json = llm.parsed_json
-            existing.llm_provider = llm.provider
-            existing.llm_model = llm.model
-            existing.transcription_provider = tr.provider
-            existing.transcription_model = tr.model
-        else:
-            db.add(
-                JobResult(
-                    job_id=job_id,
-                    created_at=now,
-                    transcript=tr.transcript,
-                    transcript_segments=tr.segments,
-                    deliverable=llm.raw_text,
-                    insights_json=llm.parsed_json,
-                    llm_provider=llm.provider,
-                    llm_model=llm.model,
-                    transcription_provider=tr.provider,
-                    transcription_model=tr.model,
-                )
+        job = get_job(db, job_id)
+        timings: dict[str, float] = dict(job.stage_timings or {})
+        if "queue_wait" not in timings:
+            # From the end of the upload save to the first pickup (retries don't count).
+            waited = (datetime.now(UTC) - job.created_at).total_seconds()
+            waited = max(0.0, waited - timings.get("upload_save", 0.0))
+            timings["queue_wait"] = round(waited, 3)
+            stage_seconds.observe(waited, stage="queue_wait")
+
+        def on_section(key: str, value: Any) -> None:
+            publish_insight_section(job_id, key, value)
+
+        tr = load_transcript_checkpoint(db, job_id)
+        if tr is None and not audio_path:
+            raise ValueError("The recording was deleted by the retention policy.")
+        if tr is None:
+            # Read before the commit below: nothing may touch db during transcription, or the
+            # session would sit idle in a transaction (holding a pooled connection) for minutes.
+            audio_sha256 = job.audio_sha256
+            update_job(
+                db,
+                job_id,
+                {
+                    "audioPath": audio_path,
+                    "status": "processing",
+                    "stage": "transcribing",
+                    "error": None,
+                },
             )
+            # Long recordings are summarized window by window while transcription continues.
+            with InsightPipeline(on_section=on_section) as pipeline:
+                # audio_path is an object-store ref; remote objects are streamed to a temp file.
+                with timed("transcription", timings), local_file(audio_path) as local_path:
+                    tr, prep_stats = transcribe_with_preprocessing(
+                        local_path,
+                        audio_sha256=audio_sha256,
+                        on_window=pipeline.add,
+                    )
+                # Checkpoint: the transcript is committed with the stage change, so a failure from
+                # here on resumes at the LLM stage instead of paying for transcription again.
+                save_transcript_checkpoint(db, job_id, tr)
+                patch = {
+                    "stage": "summarizing",
+                    "duration": format_duration(_recording_seconds(prep_stats, tr.segments)),
+                    "stageTimings": timings,
+                }
+                if prep_stats is not None:
+                    patch["preprocessStats"] = prep_stats
+                update_job(db, job_id, patch)
+                with timed("llm", timings):
+                    llm = pipeline.finish(tr.transcript)
+        else:
+            update_job(db, job_id, {"status": "processing", "stage": "summarizing", "error": None})
+            with timed("llm", timings):
+                llm = run_llm_on_transcript(tr.transcript, on_section=on_section)
+
+        with timed("persist", timings):
+            store_llm_result(db, db.get(JobResult, job_id), llm)
+            db.flush()
 
-        update_job(db, job_id, {"status": "completed", "error": None})
+        update_job(
+            db,
+            job_id,
+            {"status": "completed", "stage": "completed", "error": None, "stageTimings": timings},
+        )
+        jobs_finished_total.inc(status="completed")
     except Exception as e:
-        update_job(db, job_id, {"status": "failed", "error": str(e)})
+        db.rollback()
+        update_job(db, job_id, {"status": "failed", "stage": "failed", "error": str(e)})
+        jobs_finished_total.inc(status="failed")
     finally:
+        jobs_in_flight.dec()
         db.close()
 
 
-def get_job_result(db: Session, job_id: str) -> dict[str, Any]:
+def save_transcript_checkpoint(db: Session, job_id: str, tr: TranscriptionResult) -> None:
+    """
+    Store (and index) the transcript on the job's result row before the LLM stage runs.
+    Any previous deliverable is cleared; the caller commits.
+    """
+    existing = db.get(JobResult, job_id)
+    row = existing or JobResult(job_id=job_id)
+    row.created_at = datetime.now(UTC)
+    set_result_content(db, row, transcript=tr.transcript, segments=tr.segments, deliverable=None)
+    index_result_for_search(db, row, tr.transcript, tr.segments)
+    row.insights_json = None
+    row.llm_provider = None
+    row.llm_model = None
+    row.llm_stats = None
+    row.prompt_version = None
+    row.transcription_provider = tr.provider
+    row.transcription_model = tr.model
+    if existing is None:
+        db.add(row)
+
+
+def store_llm_result(db: Session, row: JobResult, llm: LLMResult) -> None:
+    """
+    Write the LLM stage's output onto a result row (the transcript is left as is). Bumps
+    created_at, which changes the result ETag. The caller commits.
+    """
+    row.created_at = datetime.now(UTC)
+    set_deliverable(db, row, llm.raw_text)
+    row.insights_json = llm.parsed_json
+    row.llm_provider = llm.provider
+    row.llm_model = llm.model
+    row.llm_stats = {"strategy": llm.strategy, "stages": llm.stages}
+    row.prompt_version = llm.prompt_version
+
+
+def load_transcript_checkpoint(db: Session, job_id: str) -> TranscriptionResult | None:
+    """
+    The transcript saved by an earlier attempt of this job, if transcription already finished.
+    """
     row = db.get(JobResult, job_id)
+    if row is None or (row.transcript is None and row.transcript_blob is None):
+        return None
+    content = load_result_content(db, row)
+    return TranscriptionResult(
+        transcript=content["transcript"] or "",
+        segments=content["segments"],
+        provider=row.transcription_provider,
+        model=row.transcription_model,
+        cached=True,
+    )
+
+
+def _has_transcript_checkpoint(db: Session, job_id: str) -> bool:
+    return (
+        db.execute(
+            select(JobResult.job_id).where(
+                JobResult.job_id == job_id,
+                or_(JobResult.transcript.is_not(None), JobResult.transcript_blob.is_not(None)),
+            )
+        ).first()
+        is not None
+    )
+
+
+def retry_job(db: Session, job_id: str) -> dict[str, Any]:
+    """
+    Re-queue a failed job. The worker resumes after the last completed stage: a job whose
+    transcript was saved goes straight to the LLM stage, so it can be retried even after
+    retention deleted its recording.
+    """
+    row = get_job(db, job_id)
+    if row.status != "failed":
+        raise ValueError(f"Only failed jobs can be retried (job is {row.status}).")
+    if not row.audio_path:
+        if row.audio_purged_at is None:
+            raise ValueError("The upload for this job never completed; create a new job instead.")
+        if not _has_transcript_checkpoint(db, job_id):
+            raise ValueError("The recording was deleted by the retention policy.")
+    row.attempts = 0
+    row.locked_by = None
+    row.locked_until = None
+    update_job(db, job_id, {"status": "processing", "stage": "uploaded", "error": None})
+    return job_to_dict(row)
+
+
+def job_queue_counts(db: Session) -> dict[str, int]:
+    """
+    Jobs waiting for a worker vs. currently leased, across all processes.
+    """
+    now = datetime.now(UTC)
+    leased = and_(Job.locked_until.is_not(None), Job.locked_until >= now)
+    rows = db.execute(
+        select(leased.label("leased"), func.count())
+        .where(Job.status == "processing", upload_saved())
+        .group_by("leased")
+    ).all()
+    counts = {"queued": 0, "leased": 0}
+    for is_leased, n in rows:
+        counts["leased" if is_leased else "queued"] += n
+    return counts
+
+
+def _store_out_of_row(n: int) -> bool:
+    return settings.blob_storage_enabled and n >= settings.blob_min_bytes
+
+
+def _segments_bytes(segments: list[dict]) -> int:
+    # UTF-8 size of the JSON text, like octet_length(jsonb::text) in externalize_inline_results().
+    return len(json.dumps(segments, ensure_ascii=False).encode("utf-8"))
+
+
+def set_result_content(
+    db: Session,
+    row: JobResult,
+    *,
+    transcript: str,
+    segments: list[dict] | None,
+    deliverable: str | None,
+) -> None:
+    """
+    Write the large result values, moving each one out of row (compressed, content-addressed)
+    once it reaches BLOB_MIN_BYTES. Exactly one of the inline / *_blob columns is set.
+    """
+
+    if _store_out_of_row(len(transcript.encode("utf-8"))):
+        row.transcript, row.transcript_blob = None, put_text(db, transcript)
+    else:
+        row.transcript, row.transcript_blob = transcript, None
+
+    seg_size = _segments_bytes(segments) if segments is not None else 0
+    if segments is not None and _store_out_of_row(seg_size):
+        row.transcript_segments, row.segments_blob = None, put_json(db, segments)
+    else:
+        row.transcript_segments, row.segments_blob = segments, None
+
+    set_deliverable(db, row, deliverable)
+
+
+def set_deliverable(db: Session, row: JobResult, deliverable: str | None) -> None:
+    if deliverable is None:
+        row.deliverable, row.deliverable_blob = None, None
+    elif _store_out_of_row(len(deliverable.encode("utf-8"))):
+        row.deliverable, row.deliverable_blob = None, put_text(db, deliverable)
+    else:
+        row.deliverable, row.deliverable_blob = deliverable, None
+
+
+def load_result_content(db: Session, row) -> dict[str, Any]:
+    """
+    Resolve transcript / segments / deliverable for a JobResult (or a row selected with the
+    matching columns), reading blobs only for the values that were moved out of row.
+    """
+    refs = {
+        name: getattr(row, f"{name}_blob", None)
+        for name in ("transcript", "segments", "deliverable")
+        if hasattr(row, f"{name}_blob")
+    }
+    blobs = get_blobs(db, [h for h in refs.values() if h])
+    out: dict[str, Any] = {}
+    if "transcript" in refs:
+        h = refs["transcript"]
+        out["transcript"] = decode_text(blobs[h]) if h else row.transcript
+    if "segments" in refs:
+        h = refs["segments"]
+        out["segments"] = decode_json(blobs[h]) if h else row.transcript_segments
+    if "deliverable" in refs:
+        h = refs["deliverable"]
+        out["deliverable"] = decode_text(blobs[h]) if h else row.deliverable
+    return out
+
+
+def externalize_inline_results(
+    db: Session, *, batch_size: int = 100, after: str | None = None
+) -> tuple[int, str | None]:
+    """
+    Migration helper: move large inline values of existing results into blobs.
+    Processes one batch in job_id order, starting after the given job_id, and commits.
+    Returns (rows processed, cursor for the next batch); the cursor is None once done, so each
+    row is visited at most once. Does nothing while BLOB_STORAGE_ENABLED is off.
+    """
+    if not settings.blob_storage_enabled:
+        return 0, None
+    threshold = settings.blob_min_bytes
+    stmt = (
+        select(JobResult)
+        .where(
+            or_(
+                and_(
+                    JobResult.transcript_blob.is_(None),
+                    func.octet_length(JobResult.transcript) >= threshold,
+                ),
+                and_(
+                    JobResult.segments_blob.is_(None),
+                    func.octet_length(cast(JobResult.transcript_segments, Text)) >= threshold,
+                ),
+                and_(
+                    JobResult.deliverable_blob.is_(None),
+                    func.octet_length(JobResult.deliverable) >= threshold,
+                ),
+            )
+        )
+        .order_by(JobResult.job_id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    if after is not None:
+        stmt = stmt.where(JobResult.job_id > after)
+    rows = db.execute(stmt).scalars().all()
+    for row in rows:
+        content = load_result_content(db, row)
+        set_result_content(
+            db,
+            row,
+            transcript=content["transcript"] or "",
+            segments=content["segments"],
+            deliverable=content["deliverable"],
+        )
+    db.commit()
+    if len(rows) < batch_size:
+        return len(rows), None
+    return len(rows), rows[-1].job_id
+
+
+def backfill_search_index(db: Session, *, batch_size: int = 100) -> int:
+    """
+    Migration helper: index results written before full-text search existed.
+    Processes one batch and commits; call repeatedly until it returns 0.
+    """
+    rows = (
+        db.execute(
+            select(JobResult)
+            .where(JobResult.search_vector.is_(None))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    for row in rows:
+        content = load_result_content(db, row)
+        index_result_for_search(db, row, content["transcript"] or "", content["segments"])
+    db.commit()
+    return len(rows)
+
+
+# Projectable result fields -> the columns each one needs.
+RESULT_FIELDS: dict[str, tuple] = {
+    "transcript": (JobResult.transcript, JobResult.transcript_blob),
+    "segments": (JobResult.transcript_segments, JobResult.segments_blob),
+    "deliverable": (JobResult.deliverable, JobResult.deliverable_blob),
+    "insights": (JobResult.insights_json,),
+    "llm": (
+        JobResult.llm_provider,
+        JobResult.llm_model,
+        JobResult.llm_stats,
+        JobResult.prompt_version,
+    ),
+    "transcription": (JobResult.transcription_provider, JobResult.transcription_model),
+}
+
+
+def parse_result_fields(fields: str | None) -> frozenset[str]:
+    """
+    Parse a `?fields=` value (comma-separated). Empty/None means every field.
+    """
+    if not fields:
+        return frozenset(RESULT_FIELDS)
+    wanted = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = wanted - RESULT_FIELDS.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(RESULT_FIELDS)}."
+        )
+    return wanted
+
+
+def result_etag(job_id: str, created_at: datetime, fields: frozenset[str]) -> str:
+    # A result is rewritten (with a new created_at) whenever the job is re-run.
+    return f'W/"{job_id}-{created_at.timestamp():.6f}-{"+".join(sorted(fields))}"'
+
+
+def get_job_result_etag(db: Session, job_id: str, fields: frozenset[str]) -> str | None:
+    """
+    Cheap lookup for conditional GETs: reads created_at only, none of the large columns.
+    """
+    created_at = db.execute(
+        select(JobResult.created_at)
+        .join(Job, Job.id == JobResult.job_id)
+        .where(JobResult.job_id == job_id, Job.status == "completed")
+    ).scalar_one_or_none()
+    return result_etag(job_id, created_at, fields) if created_at is not None else None
+
+
+def get_job_result(
+    db: Session, job_id: str, fields: frozenset[str] | None = None
+) -> tuple[dict[str, Any], str]:
+    """
+    Load a job's result (and the job's audio path) in one query. Returns (payload, etag).
+    Only the columns for the requested fields are read. Jobs that have not completed have no
+    result yet, even if their transcript checkpoint was saved.
+    """
+    fields = fields if fields is not None else frozenset(RESULT_FIELDS)
+    cols = [JobResult.job_id, JobResult.created_at, Job.audio_path]
+    for name in RESULT_FIELDS:
+        if name in fields:
+            cols.extend(RESULT_FIELDS[name])
+    row = db.execute(
+        select(*cols)
+        .join(Job, Job.id == JobResult.job_id)
+        .where(JobResult.job_id == job_id, Job.status == "completed")
+    ).first()
     if not row:
         raise FileNotFoundError("result not ready")
-    return {
+
+    out: dict[str, Any] = {
         "jobId": row.job_id,
         "createdAt": row.created_at.isoformat(),
-        "audioPath": db.get(Job, job_id).audio_path if db.get(Job, job_id) else None,
-        "transcript": row.transcript,
-        "segments": row.transcript_segments,
-        "deliverable": row.deliverable,
-        "insights": row.insights_json,
-        "llm": {"provider": row.llm_provider, "model": row.llm_model},
-        "transcription": {"provider": row.transcription_provider, "model": row.transcription_model},
+        "audioPath": row.audio_path,
     }
+    # Only the projected *_blob columns are on the row, so only those blobs are read.
+    out.update(load_result_content(db, row))
+    if "insights" in fields:
+        out["insights"] = row.insights_json
+    if "llm" in fields:
+        out["llm"] = {
+            "provider": row.llm_provider,
+            "model": row.llm_model,
+            "stats": row.llm_stats,
+            "promptVersion": row.prompt_version,
+        }
+    if "transcription" in fields:
+        out["transcription"] = {
+            "provider": row.transcription_provider,
+            "model": row.transcription_model,
+        }
+    return out, result_etag(row.job_id, row.created_at, fields)
+
+
+def job_event(row: Job) -> dict[str, Any]:
+    return {"jobId": row.id, "status": row.status, "stage": row.stage, "error": row.error}
 
 
-def job_to_dict(row: Job) -> dict[str, Any]:
+def job_events_for(db: Session, job_ids: list[str]) -> list[dict[str, Any]]:
+    rows = db.execute(select(Job).where(Job.id.in_(job_ids))).scalars().all()
+    return [job_event(r) for r in rows]
+
+
+def job_to_dict(row) -> dict[str, Any]:
+    """
+    Accepts a Job or a row selected with _JOB_LIST_COLUMNS.
+    """
     return {
         "id": row.id,
         "createdAt": row.created_at.isoformat(),
         "fileName": row.file_name,
         "optionId": row.option_id,
         "status": row.status,
+        "stage": row.stage,
         "duration": row.duration,
         "sourceId": row.source_id,
+        "priority": row.priority,
         "error": row.error,
+        "stageTimings": row.stage_timings,
         "resultPath": "db",  # kept for frontend compatibility; data is stored in DB now
     }
 
@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import cache
+from pathlib import Path
 from typing import Any
 
 from openai import OpenAI
 
 from ..core.config import settings
+from .cache import JsonDiskCache, cache_key
+from .executor import run_blocking
+from .metrics import provider_errors_total
+from .ratelimit import Budget, call_with_backoff, chat_budgets
+from .resources import get_openai_client
 
 
 SYSTEM_PROMPT = """You are an AI Insight Generator embedded inside a secure relationship-practice platform.
@@ -137,6 +148,95 @@ CONTENT REQUIREMENTS:
 """
 
 
+# Map step: one call per transcript chunk; produces working notes in the final schema.
+MAP_PROMPT_TEMPLATE = """You are given ONE PART ({{PART_NUMBER}} of {{PART_COUNT}}) of a verbatim transcript from a recorded relationship session.
+
+Extract grounded working notes from THIS PART ONLY. They will later be merged with notes from the
+other parts into a client-facing summary, so be specific and do not write introductions or conclusions.
+
+Use ONLY the information present in this part.
+Do NOT infer facts, histories, diagnoses, or intentions not supported by the conversation.
+
+==============================
+
+TRANSCRIPT PART
+
+==============================
+
+{{TRANSCRIPT_PART}}
+
+==============================
+
+Output MUST be valid JSON only (no markdown, no extra text), with each value an array of short strings
+(use an empty array if this part has nothing for a key):
+
+{
+  "session_overview": ["..."],
+  "core_relationship_dynamics_observed": ["..."],
+  "expressed_needs_and_concerns_as_heard": ["..."],
+  "moments_of_alignment_understanding_or_repair": ["..."],
+  "reflective_questions_for_consideration": ["..."]
+}
+"""  # noqa: E501
+
+
+# Reduce step: merges the per-part notes into the same deliverable USER_PROMPT_TEMPLATE asks for.
+REDUCE_PROMPT_TEMPLATE = """You are given working notes extracted, in order, from consecutive parts of ONE recorded relationship session.
+
+Your task is to generate a structured deliverable titled:
+
+“Session Insight & Relationship Pattern Summary”
+
+The output will be shown directly to clients inside a professional, enterprise-grade dashboard.
+Merge overlapping points, keep the chronology of the session, and drop repetition.
+
+Use ONLY the information present in the notes.
+Do NOT infer facts, histories, diagnoses, or intentions not supported by the conversation.
+
+==============================
+
+SESSION NOTES (IN ORDER)
+
+==============================
+
+{{SECTION_NOTES}}
+
+==============================
+
+OUTPUT FORMAT REQUIREMENT (CRITICAL):
+
+- Output MUST be valid JSON only (no markdown, no extra text).
+- Use the keys EXACTLY as specified.
+- Each value MUST be an array of strings.
+  - For the first four sections, each string should be a short paragraph (2–4 lines max).
+  - For reflective questions, each string should be a single question (no numbering).
+- Use **formal, minimal emojis** sparingly, and **bold text** selectively, as in a client-ready summary.
+
+Return this exact JSON schema:
+
+{
+  "session_overview": ["..."],
+  "core_relationship_dynamics_observed": ["..."],
+  "expressed_needs_and_concerns_as_heard": ["..."],
+  "moments_of_alignment_understanding_or_repair": ["..."],
+  "reflective_questions_for_consideration": ["...", "...", "..."]
+}
+
+CONTENT REQUIREMENTS:
+
+- Use ONLY the notes.
+- No diagnoses, no blame, no therapy jargon unless clearly implied.
+- Keep language safe to show directly to clients.
+"""  # noqa: E501
+
+
+# Changes whenever any prompt text changes; part of the LLM cache key.
+PROMPT_VERSION = hashlib.sha256(
+    "\x00".join(
+        [SYSTEM_PROMPT, USER_PROMPT_TEMPLATE, MAP_PROMPT_TEMPLATE, REDUCE_PROMPT_TEMPLATE]
+    ).encode("utf-8")
+).hexdigest()[:12]
+
 
 @dataclass(frozen=True)
 class LLMResult:
@@ -144,36 +244,68 @@ class LLMResult:
     parsed_json: dict[str, Any] | None
     provider: str
     model: str
+    # "single" (one call) or "map_reduce"; stages holds per-call latency + token usage.
+    strategy: str = "single"
+    stages: list[dict[str, Any]] | None = None
+    cached: bool = False
+    # PROMPT_VERSION the result was generated with (None for the stub).
+    prompt_version: str | None = None
+
+
+# Called with (section key, section value) as each top-level section of the insights JSON completes.
+SectionCallback = Callable[[str, Any], None]
 
 
-def run_llm_on_transcript(transcript: str) -> LLMResult:
+def run_llm_on_transcript(
+    transcript: str,
+    *,
+    use_cache: bool = True,
+    on_section: SectionCallback | None = None,
+) -> LLMResult:
     """
     Generate insights from transcript using a hard-coded prompt.
 
-    - If OPENAI_API_KEY is set: uses OpenAI Chat Completions.
+    - If OPENAI_API_KEY is set: uses OpenAI Chat Completions. Transcripts whose prompt exceeds
+      LLM_MAP_REDUCE_THRESHOLD_TOKENS are summarized per chunk in parallel (map) and then merged
+      into the final schema (reduce). Results are cached by (PROMPT_VERSION, transcript hash,
+      model); use_cache=False forces regeneration (and refreshes the cached entry).
+      If on_section is given, the final call is streamed and each section is reported as soon
+      as its JSON value is complete (the returned LLMResult is unchanged).
     - Otherwise: returns a deterministic stub JSON.
     """
     prompt = USER_PROMPT_TEMPLATE.replace("{{FULL_SESSION_TRANSCRIPT}}", transcript)
 
     if settings.openai_api_key:
-        client = OpenAI(api_key=settings.openai_api_key)
-        resp = client.chat.completions.create(
-            model=settings.openai_chat_model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.2,
-        )
-        text = (resp.choices[0].message.content or "").strip()
-        parsed = _try_parse_json(text)
-        return LLMResult(
-            raw_text=text,
-            parsed_json=parsed,
-            provider="openai",
-            model=settings.openai_chat_model,
-        )
+        cache = llm_cache() if settings.llm_cache_enabled else None
+        key = _result_cache_key(transcript)
+        if cache is not None and use_cache:
+            hit = _cached_result(cache, key, on_section)
+            if hit is not None:
+                return hit
+
+        client = get_openai_client()
+        try:
+            if count_tokens(prompt) > settings.llm_map_reduce_threshold_tokens:
+                result = _run_map_reduce(client, transcript, on_section=on_section)
+            else:
+                text, stage = _chat_json(
+                    client, SYSTEM_PROMPT, prompt, stage="single", on_section=on_section
+                )
+                result = LLMResult(
+                    raw_text=text,
+                    parsed_json=_try_parse_json(text),
+                    provider="openai",
+                    model=settings.openai_chat_model,
+                    stages=[stage],
+                    prompt_version=PROMPT_VERSION,
+                )
+        except Exception:
+            provider_errors_total.inc(provider="openai", operation="chat")
+            raise
+        # Unparseable output is not cached, so the next run tries again.
+        if cache is not None and result.parsed_json is not None:
+            cache.put(key, asdict(result))
+        return result
 
     stub = {
         "session_overview": ["Stub mode: configure OPENAI_API_KEY for real insights."],
@@ -186,6 +318,7 @@ def run_llm_on_transcript(transcript: str) -> LLMResult:
             "What felt different by the end of the session, if anything?",
         ],
     }
+    _emit_sections(stub, on_section)
     return LLMResult(
         raw_text=json.dumps(stub, ensure_ascii=False),
         parsed_json=stub,
@@ -194,6 +327,129 @@ def run_llm_on_transcript(transcript: str) -> LLMResult:
     )
 
 
+def _result_cache_key(transcript: str) -> str:
+    return cache_key(
+        "llm",
+        PROMPT_VERSION,
+        hashlib.sha256(transcript.encode("utf-8")).hexdigest(),
+        settings.openai_chat_model,
+    )
+
+
+def _cached_result(
+    cache: JsonDiskCache, key: str, on_section: SectionCallback | None
+) -> LLMResult | None:
+    hit = cache.get(key)
+    if hit is None or hit.get("parsed_json") is None:
+        return None
+    _emit_sections(hit.get("parsed_json"), on_section)
+    return LLMResult(
+        raw_text=hit.get("raw_text") or "",
+        parsed_json=hit.get("parsed_json"),
+        provider=hit.get("provider") or "openai",
+        model=hit.get("model") or settings.openai_chat_model,
+        strategy=hit.get("strategy") or "single",
+        stages=hit.get("stages"),
+        cached=True,
+        prompt_version=PROMPT_VERSION,
+    )
+
+
+def _emit_sections(parsed: dict[str, Any] | None, on_section: SectionCallback | None) -> None:
+    if on_section is None or not isinstance(parsed, dict):
+        return
+    for k, v in parsed.items():
+        on_section(k, v)
+
+
+class InsightSectionParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    Feed it text deltas; it returns (key, value) for each top-level member whose value has
+    just been closed, so e.g. "session_overview" is available before the model finishes.
+    """
+
+    def __init__(self) -> None:
+        self._buf: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start: int | None = None  # offset of the current top-level member
+        self._pos = 0
+
+    def feed(self, delta: str) -> list[tuple[str, Any]]:
+        out: list[tuple[str, Any]] = []
+        for ch in delta:
+            self._buf.append(ch)
+            pos = self._pos
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._member_start is None:
+                    self._member_start = pos
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0 and self._member_start is not None:
+                    # Last member was a scalar; the object's closing brace ends it.
+                    member = self._parse_member("".join(self._buf[self._member_start : pos]))
+                    if member is not None:
+                        out.append(member)
+                    self._member_start = None
+                elif self._depth == 1 and self._member_start is not None:
+                    member = self._parse_member("".join(self._buf[self._member_start : pos + 1]))
+                    if member is not None:
+                        out.append(member)
+                    self._member_start = None
+            elif ch == "," and self._depth == 1 and self._member_start is not None:
+                # Scalar member value (string/number/literal) ends at the comma.
+                member = self._parse_member("".join(self._buf[self._member_start : pos]))
+                if member is not None:
+                    out.append(member)
+                self._member_start = None
+        return out
+
+    @staticmethod
+    def _parse_member(fragment: str) -> tuple[str, Any] | None:
+        try:
+            val = json.loads("{" + fragment + "}")
+        except ValueError:
+            return None
+        if isinstance(val, dict) and len(val) == 1:
+            return next(iter(val.items()))
+        return None
+
+
+async def run_llm_on_transcript_async(transcript: str, *, use_cache: bool = True) -> LLMResult:
+    """
+    Async variant of run_llm_on_transcript for request handlers (does not block the event loop).
+    """
+    return await run_blocking(run_llm_on_transcript, transcript, use_cache=use_cache)
+
+
+@cache
+def _cache_for(root: str, max_bytes: int, ttl_seconds: float) -> JsonDiskCache:
+    return JsonDiskCache(root, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+
+def llm_cache() -> JsonDiskCache:
+    """
+    Process-wide insight cache under OUTPUT_DIR/cache/llm.
+    """
+    root = str(Path(settings.output_dir) / "cache" / "llm")
+    return _cache_for(root, settings.llm_cache_max_bytes, settings.llm_cache_ttl_seconds)
+
+
 def _try_parse_json(text: str) -> dict[str, Any] | None:
     try:
         val = json.loads(text)
@@ -213,3 +469,333 @@ def _try_parse_json(text: str) -> dict[str, Any] | None:
     return None
 
 
+# ---------------------------------------------------------------------------
+# Long transcripts: token-aware chunking + map-reduce
+# ---------------------------------------------------------------------------
+
+try:  # Optional: exact token counts when tiktoken is installed.
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # pragma: no cover - depends on environment
+    _ENCODING = None
+
+_CHARS_PER_TOKEN = 4  # rough heuristic when tiktoken is unavailable
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def chunk_transcript(text: str, max_tokens: int, overlap_tokens: int = 0) -> list[str]:
+    """
+    Split text into chunks of at most ~max_tokens, on word boundaries, with a small overlap
+    so statements that straddle a boundary are seen whole by at least one chunk.
+    """
+    words = text.split()
+    if not words:
+        return []
+    costs = [count_tokens(w + " ") for w in words] if _ENCODING is not None else [
+        (len(w) + 1 + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN for w in words
+    ]
+
+    chunks: list[str] = []
+    start = 0
+    while start < len(words):
+        end = start
+        used = 0
+        while end < len(words) and (used + costs[end] <= max_tokens or end == start):
+            used += costs[end]
+            end += 1
+        chunks.append(" ".join(words[start:end]))
+        if end >= len(words):
+            break
+        # Step back by ~overlap_tokens worth of words for the next chunk.
+        back = end
+        carried = 0
+        while back > start + 1 and carried + costs[back - 1] <= overlap_tokens:
+            back -= 1
+            carried += costs[back]
+        start = back
+    return chunks
+
+
+def _chat_json(
+    client: OpenAI,
+    system: str,
+    user: str,
+    *,
+    stage: str,
+    on_section: SectionCallback | None = None,
+) -> tuple[str, dict[str, Any]]:
+    t0 = time.perf_counter()
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+    budgets = chat_budgets(
+        count_tokens(system) + count_tokens(user) + settings.llm_completion_tokens_estimate
+    )
+    if on_section is not None:
+        return _chat_json_streamed(
+            client, messages, stage=stage, on_section=on_section, t0=t0, budgets=budgets
+        )
+
+    resp = call_with_backoff(
+        lambda: client.chat.completions.create(
+            model=settings.openai_chat_model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=0.2,
+        ),
+        operation="chat",
+        budgets=budgets,
+    )
+    elapsed = time.perf_counter() - t0
+    usage = getattr(resp, "usage", None)
+    text = (resp.choices[0].message.content or "").strip()
+    return text, {
+        "stage": stage,
+        "seconds": round(elapsed, 3),
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    }
+
+
+def _chat_json_streamed(
+    client: OpenAI,
+    messages: list[dict[str, str]],
+    *,
+    stage: str,
+    on_section: SectionCallback,
+    t0: float,
+    budgets: list[Budget],
+) -> tuple[str, dict[str, Any]]:
+    # Only opening the stream is retried; once sections have been published it can't be redone.
+    stream = call_with_backoff(
+        lambda: client.chat.completions.create(
+            model=settings.openai_chat_model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=0.2,
+            stream=True,
+            stream_options={"include_usage": True},
+        ),
+        operation="chat",
+        budgets=budgets,
+    )
+    parser = InsightSectionParser()
+    parts: list[str] = []
+    usage = None
+    first_section: float | None = None
+    for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content or ""
+        if not delta:
+            continue
+        parts.append(delta)
+        for key, value in parser.feed(delta):
+            if first_section is None:
+                first_section = time.perf_counter() - t0
+            on_section(key, value)
+    elapsed = time.perf_counter() - t0
+    return "".join(parts).strip(), {
+        "stage": stage,
+        "seconds": round(elapsed, 3),
+        "first_section_seconds": round(first_section, 3) if first_section is not None else None,
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    }
+
+
+def _map_prompt(i: int, count: int, part: str) -> str:
+    return (
+        MAP_PROMPT_TEMPLATE.replace("{{PART_NUMBER}}", str(i + 1))
+        .replace("{{PART_COUNT}}", str(count))
+        .replace("{{TRANSCRIPT_PART}}", part)
+    )
+
+
+def _run_map_reduce(
+    client: OpenAI, transcript: str, *, on_section: SectionCallback | None = None
+) -> LLMResult:
+    chunks = chunk_transcript(
+        transcript, settings.llm_chunk_tokens, settings.llm_chunk_overlap_tokens
+    )
+
+    def _map(item: tuple[int, str]) -> tuple[str, dict[str, Any]]:
+        i, chunk = item
+        prompt = _map_prompt(i, len(chunks), chunk)
+        return _chat_json(client, SYSTEM_PROMPT, prompt, stage=f"map[{i}]")
+
+    t0 = time.perf_counter()
+    workers = max(1, min(settings.llm_max_concurrency, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-map") as pool:
+        mapped = list(pool.map(_map, enumerate(chunks)))
+    map_seconds = time.perf_counter() - t0
+
+    return _reduce(
+        client,
+        list(enumerate(mapped)),
+        len(chunks),
+        map_seconds=map_seconds,
+        strategy="map_reduce",
+        on_section=on_section,
+    )
+
+
+def _reduce(
+    client: OpenAI,
+    mapped: list[tuple[int, tuple[str, dict[str, Any]]]],
+    part_count: int,
+    *,
+    map_seconds: float,
+    strategy: str,
+    on_section: SectionCallback | None,
+) -> LLMResult:
+    """
+    Merge (part index, map call output) notes, in part order, into the final deliverable.
+    """
+    notes = []
+    for i, (text, _) in mapped:
+        parsed = _try_parse_json(text)
+        body = json.dumps(parsed, ensure_ascii=False, indent=2) if parsed is not None else text
+        notes.append(f"--- Part {i + 1} of {part_count} ---\n{body}")
+
+    reduce_prompt = REDUCE_PROMPT_TEMPLATE.replace("{{SECTION_NOTES}}", "\n\n".join(notes))
+    text, reduce_stage = _chat_json(
+        client, SYSTEM_PROMPT, reduce_prompt, stage="reduce", on_section=on_section
+    )
+
+    map_stages = [stage for _, (_, stage) in mapped]
+    stages = [
+        {
+            "stage": "map",
+            "seconds": round(map_seconds, 3),
+            "chunks": len(mapped),
+            "prompt_tokens": sum(s["prompt_tokens"] or 0 for s in map_stages),
+            "completion_tokens": sum(s["completion_tokens"] or 0 for s in map_stages),
+        },
+        *map_stages,
+        reduce_stage,
+    ]
+    return LLMResult(
+        raw_text=text,
+        parsed_json=_try_parse_json(text),
+        provider="openai",
+        model=settings.openai_chat_model,
+        strategy=strategy,
+        stages=stages,
+        prompt_version=PROMPT_VERSION,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Long recordings: map while transcribing, reduce at the end
+# ---------------------------------------------------------------------------
+
+
+class InsightPipeline:
+    """
+    Overlaps the map step with transcription of a long recording.
+
+    Pass `add` as the on_window callback of transcribe_audio / transcribe_with_preprocessing:
+    each transcribed window is summarized (MAP_PROMPT_TEMPLATE) while later windows are still
+    being transcribed. finish() then only has the reduce call left. When nothing could be
+    pipelined (recording not split, cached transcript, fallback provider, no API key, or a
+    transcript projected to fit one call) finish() is just run_llm_on_transcript.
+    Use as a context manager so map calls are cancelled if transcription fails.
+    """
+
+    def __init__(
+        self, *, use_cache: bool = True, on_section: SectionCallback | None = None
+    ) -> None:
+        self._use_cache = use_cache
+        self._on_section = on_section
+        self._active = settings.llm_pipeline_enabled and bool(settings.openai_api_key)
+        self._pool: ThreadPoolExecutor | None = None
+        self._client: OpenAI | None = None
+        self._futures: dict[int, Future[tuple[str, dict[str, Any]]]] = {}
+        self._received: set[int] = set()
+        self._count = 0
+        self._t0 = 0.0
+
+    def __enter__(self) -> InsightPipeline:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def add(self, index: int, count: int, text: str) -> None:
+        if not self._active:
+            return
+        if self._pool is None:
+            # Decided on the first window: recordings projected to fit under the map-reduce
+            # threshold are left to a single call after transcription, as before.
+            projected = count_tokens(USER_PROMPT_TEMPLATE) + count_tokens(text) * count
+            if index != 0 or projected <= settings.llm_map_reduce_threshold_tokens:
+                self._active = False
+                return
+            self._count = count
+            self._client = get_openai_client()
+            self._t0 = time.perf_counter()
+            self._pool = ThreadPoolExecutor(
+                max_workers=max(1, min(settings.llm_max_concurrency, count)),
+                thread_name_prefix="llm-map",
+            )
+        self._received.add(index)
+        if text.strip():
+            self._futures[index] = self._pool.submit(
+                _chat_json,
+                self._client,
+                SYSTEM_PROMPT,
+                _map_prompt(index, count, text),
+                stage=f"map[{index}]",
+            )
+
+    def finish(self, transcript: str) -> LLMResult:
+        """
+        The insights for the complete (stitched) transcript, reducing the pipelined notes.
+        Cached like run_llm_on_transcript, under the same key.
+        """
+        complete = self._pool is not None and len(self._received) == self._count
+        if not complete or not self._futures:
+            self.close()
+            return run_llm_on_transcript(
+                transcript, use_cache=self._use_cache, on_section=self._on_section
+            )
+        try:
+            cache = llm_cache() if settings.llm_cache_enabled else None
+            key = _result_cache_key(transcript)
+            if cache is not None and self._use_cache:
+                hit = _cached_result(cache, key, self._on_section)
+                if hit is not None:
+                    return hit
+            try:
+                mapped = [(i, self._futures[i].result()) for i in sorted(self._futures)]
+                result = _reduce(
+                    self._client,
+                    mapped,
+                    self._count,
+                    map_seconds=time.perf_counter() - self._t0,
+                    strategy="pipelined",
+                    on_section=self._on_section,
+                )
+            except Exception:
+                provider_errors_total.inc(provider="openai", operation="chat")
+                raise
+            if cache is not None and result.parsed_json is not None:
+                cache.put(key, asdict(result))
+            return result
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
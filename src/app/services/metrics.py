@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TypeVar
+
+from ..core.config import settings
+
+# Minimal in-process Prometheus instrumentation (text exposition format 0.0.4).
+# Every observe/inc is a no-op when METRICS_ENABLED is false.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Stage latencies range from milliseconds (DB writes) to tens of minutes (long transcriptions).
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _fmt_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, doc, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not settings.metrics_enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_num(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, doc, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._collect: Callable[[], dict[tuple[str, ...], float]] | None = None
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not settings.metrics_enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], dict[tuple[str, ...], float]]) -> None:
+        """
+        Compute the value(s) at scrape time instead (keys are label-value tuples).
+        """
+        self._collect = fn
+
+    def samples(self) -> list[str]:
+        if self._collect is not None:
+            items = sorted(self._collect().items())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = STAGE_BUCKETS,
+    ) -> None:
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last is +Inf), sum]
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not settings.metrics_enabled:
+            return
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[i] += 1
+            total[0] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(c), t[0])) for k, (c, t) in self._values.items())
+        out: list[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += n
+                le = _fmt_labels(self.labelnames, key, f'le="{_fmt_num(bound)}"')
+                out.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _fmt_labels(self.labelnames, key)
+            out.append(f"{self.name}_sum{labels} {_fmt_num(total)}")
+            out.append(f"{self.name}_count{labels} {cumulative}")
+        return out
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.register(
+    Histogram(
+        "insightrelay_stage_seconds",
+        "Time spent per processing stage (upload_save, queue_wait, transcription, llm, persist).",
+        ("stage",),
+    )
+)
+jobs_finished_total = registry.register(
+    Counter("insightrelay_jobs_finished_total", "Jobs finished by this process.", ("status",))
+)
+provider_errors_total = registry.register(
+    Counter(
+        "insightrelay_provider_errors_total",
+        "Failed provider calls (after retries in services/ratelimit.py).",
+        ("provider", "operation"),
+    )
+)
+provider_retries_total = registry.register(
+    Counter(
+        "insightrelay_provider_retries_total",
+        "Provider calls retried after a 429, 5xx or connection error (services/ratelimit.py).",
+        ("operation",),
+    )
+)
+provider_responses_total = registry.register(
+    Counter(
+        "insightrelay_provider_responses_total",
+        "HTTP responses from the provider by status code.",
+        ("operation", "code"),
+    )
+)
+rate_limit_wait_seconds = registry.register(
+    Histogram(
+        "insightrelay_rate_limit_wait_seconds",
+        "Time provider calls spent queued for the shared rate limit.",
+        ("operation",),
+    )
+)
+retention_deleted_total = registry.register(
+    Counter(
+        "insightrelay_retention_deleted_total",
+        "Files deleted by retention GC (services/retention.py) by kind: "
+        "audio, result, upload, blob.",
+        ("kind",),
+    )
+)
+jobs_in_flight = registry.register(
+    Gauge("insightrelay_jobs_in_flight", "Jobs currently being processed by this process.")
+)
+jobs_queue = registry.register(
+    Gauge(
+        "insightrelay_jobs_queue",
+        "Jobs in the shared queue by state (queued = waiting for a worker, leased = running).",
+        ("state",),
+    )
+)
+
+
+@contextmanager
+def timed(stage: str, timings: dict[str, float] | None = None) -> Iterator[None]:
+    """
+    Measure a block: observed into insightrelay_stage_seconds and, if given, stored in timings.
+    Nothing is recorded if the block raises.
+    """
+    t0 = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - t0
+    stage_seconds.observe(elapsed, stage=stage)
+    if timings is not None:
+        timings[stage] = round(elapsed, 3)
+
+
+def _operation_for(path: str) -> str:
+    if path.endswith("/audio/transcriptions"):
+        return "transcription"
+    if path.endswith("/chat/completions"):
+        return "chat"
+    return "other"
+
+
+def on_provider_response(response) -> None:
+    provider_responses_total.inc(
+        operation=_operation_for(response.request.url.path), code=str(response.status_code)
+    )
+
+
+def render_metrics() -> str:
+    return registry.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a background thread (for processes without an HTTP app, i.e. workers).
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
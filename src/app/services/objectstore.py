@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from datetime import UTC, datetime
+from functools import cache
+from pathlib import Path
+from typing import Any, BinaryIO, Protocol
+from uuid import uuid4
+
+from ..core.config import settings
+from .storage import COPY_CHUNK_BYTES, SavedUpload, StoredResult, ensure_dir, stream_and_hash
+
+try:  # Optional: only needed for STORAGE_BACKEND=s3.
+    import boto3
+except ImportError:  # pragma: no cover - depends on environment
+    boto3 = None
+
+# Uploads and stored results are addressed by a ref: a filesystem path for the local backend
+# (what Job.audio_path always held) or s3://bucket/key. Refs are resolved by their form, not
+# the current STORAGE_BACKEND, so switching backends keeps existing jobs readable.
+S3_SCHEME = "s3://"
+
+# S3 multipart parts must be at least 5MB (except the last one).
+_MIN_PART_BYTES = 5 * 1024 * 1024
+
+
+class ObjectWriter(Protocol):
+    """
+    A streaming write. Nothing is visible under ref until close(); abort() discards it.
+    """
+
+    ref: str
+
+    def write(self, data: bytes) -> None: ...
+
+    def close(self) -> None: ...
+
+    def abort(self) -> None: ...
+
+
+class ObjectStore(Protocol):
+    name: str
+
+    def ref(self, key: str) -> str: ...
+
+    def writer(self, key: str) -> ObjectWriter: ...
+
+    def open(self, ref: str) -> BinaryIO: ...
+
+    def delete(self, ref: str) -> None: ...
+
+    def iter_keys(self, prefix: str) -> Iterator[str]: ...
+
+
+def sharded_key(kind: str, when: datetime, ident: str, name: str) -> str:
+    """
+    `<kind>/YYYY/MM/DD/<2 hex>/<name>`: one directory per UTC day (so retention can drop whole
+    days, oldest first), fanned out 256 ways by a hash of ident to keep directories small.
+    """
+    shard = hashlib.sha256(ident.encode("utf-8")).hexdigest()[:2]
+    return f"{kind}/{when.astimezone(UTC):%Y/%m/%d}/{shard}/{name}"
+
+
+def key_day(key: str) -> datetime | None:
+    """
+    The UTC day a sharded_key() was filed under, or None for other keys.
+    """
+    parts = key.split("/")
+    if len(parts) < 5:
+        return None
+    try:
+        return datetime.strptime("/".join(parts[1:4]), "%Y/%m/%d").replace(tzinfo=UTC)
+    except ValueError:
+        return None
+
+
+class _LocalWriter:
+    def __init__(self, path: Path) -> None:
+        self.ref = str(path)
+        ensure_dir(str(path.parent))
+        self._tmp = path.with_name(path.name + ".part")
+        self._file = open(self._tmp, "wb")
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def close(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.ref)
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class LocalStore:
+    """
+    Objects as files under OUTPUT_DIR. Multiple nodes need a shared filesystem for this.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def ref(self, key: str) -> str:
+        return str(self.root / key)
+
+    def writer(self, key: str) -> ObjectWriter:
+        return _LocalWriter(self.root / key)
+
+    def open(self, ref: str) -> BinaryIO:
+        return open(ref, "rb")
+
+    def delete(self, ref: str) -> None:
+        path = Path(ref)
+        path.unlink(missing_ok=True)
+        # Drop shard/day directories left empty, up to (not including) the root.
+        root = self.root.resolve()
+        parent = path.resolve().parent
+        while parent != root and root in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        """
+        Keys under prefix in sorted order, lazily (stop early to read only the oldest days).
+        """
+        base = self.root / prefix
+
+        def _walk(d: Path) -> Iterator[Path]:
+            try:
+                entries = sorted(d.iterdir(), key=lambda p: p.name)
+            except FileNotFoundError:
+                return
+            for p in entries:
+                if p.is_dir():
+                    yield from _walk(p)
+                elif not p.name.endswith(".part"):
+                    yield p
+
+        for p in _walk(base):
+            yield p.relative_to(self.root).as_posix()
+
+
+class _S3MultipartWriter:
+    """
+    Buffers at most one part in memory. Objects smaller than a part are sent with one PUT.
+    """
+
+    def __init__(self, client, bucket: str, key: str, part_bytes: int) -> None:
+        self.ref = f"{S3_SCHEME}{bucket}/{key}"
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._part_bytes = max(_MIN_PART_BYTES, part_bytes)
+        self._buf = bytearray()
+        self._upload_id: str | None = None
+        self._parts: list[dict[str, Any]] = []
+
+    def write(self, data: bytes) -> None:
+        self._buf += data
+        while len(self._buf) >= self._part_bytes:
+            part = bytes(self._buf[: self._part_bytes])
+            del self._buf[: self._part_bytes]
+            self._upload_part(part)
+
+    def _upload_part(self, body: bytes) -> None:
+        if self._upload_id is None:
+            resp = self._client.create_multipart_upload(Bucket=self._bucket, Key=self._key)
+            self._upload_id = resp["UploadId"]
+        number = len(self._parts) + 1
+        resp = self._client.upload_part(
+            Bucket=self._bucket,
+            Key=self._key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=body,
+        )
+        self._parts.append({"ETag": resp["ETag"], "PartNumber": number})
+
+    def close(self) -> None:
+        if self._upload_id is None:
+            self._client.put_object(Bucket=self._bucket, Key=self._key, Body=bytes(self._buf))
+            return
+        if self._buf:
+            self._upload_part(bytes(self._buf))
+            self._buf.clear()
+        self._client.complete_multipart_upload(
+            Bucket=self._bucket,
+            Key=self._key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+    def abort(self) -> None:
+        self._buf.clear()
+        if self._upload_id is not None:
+            self._client.abort_multipart_upload(
+                Bucket=self._bucket, Key=self._key, UploadId=self._upload_id
+            )
+
+
+class S3Store:
+    """
+    Objects in an S3-compatible bucket (AWS, MinIO, R2, ...), shared by every node.
+    """
+
+    name = "s3"
+
+    def __init__(self, client, bucket: str, prefix: str = "") -> None:
+        self._client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def ref(self, key: str) -> str:
+        return f"{S3_SCHEME}{self.bucket}/{self.prefix}{key}"
+
+    def writer(self, key: str) -> ObjectWriter:
+        return _S3MultipartWriter(
+            self._client, self.bucket, self.prefix + key, settings.s3_part_bytes
+        )
+
+    def open(self, ref: str) -> BinaryIO:
+        bucket, key = parse_s3_ref(ref)
+        # StreamingBody: read(n) pulls from the HTTP response, nothing is buffered up front.
+        return self._client.get_object(Bucket=bucket, Key=key)["Body"]
+
+    def delete(self, ref: str) -> None:
+        bucket, key = parse_s3_ref(ref)
+        self._client.delete_object(Bucket=bucket, Key=key)
+
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        # ListObjectsV2 returns keys in lexicographic order, one page at a time.
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"][len(self.prefix) :]
+
+
+def parse_s3_ref(ref: str) -> tuple[str, str]:
+    bucket, _, key = ref[len(S3_SCHEME) :].partition("/")
+    if not bucket or not key:
+        raise ValueError(f"Invalid S3 reference: {ref!r}")
+    return bucket, key
+
+
+@cache
+def _s3_store(bucket: str, prefix: str) -> S3Store:
+    if boto3 is None:
+        raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package (pip install boto3)")
+    client = boto3.client(
+        "s3",
+        endpoint_url=settings.s3_endpoint_url or None,
+        region_name=settings.s3_region or None,
+        aws_access_key_id=settings.s3_access_key_id or None,
+        aws_secret_access_key=settings.s3_secret_access_key or None,
+    )
+    return S3Store(client, bucket, prefix)
+
+
+def get_store(output_dir: str) -> ObjectStore:
+    """
+    The backend new objects are written to (STORAGE_BACKEND: local | s3).
+    """
+    backend = (settings.storage_backend or "local").strip().lower()
+    if backend == "local":
+        return LocalStore(output_dir)
+    if backend == "s3":
+        if not settings.s3_bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        return _s3_store(settings.s3_bucket, settings.s3_prefix)
+    raise RuntimeError(f"Unknown storage backend {backend!r}. Available: local, s3")
+
+
+def store_for_ref(ref: str) -> ObjectStore:
+    """
+    The backend holding an existing ref. Local refs resolve against OUTPUT_DIR, so deletes
+    prune the emptied shard/day directories under it (paths elsewhere are left as they are).
+    """
+    if ref.startswith(S3_SCHEME):
+        bucket, _ = parse_s3_ref(ref)
+        return _s3_store(bucket, "")
+    return LocalStore(settings.output_dir)
+
+
+def is_local_ref(ref: str) -> bool:
+    return not ref.startswith(S3_SCHEME)
+
+
+def put_stream(
+    output_dir: str, key: str, src_file, *, max_bytes: int | None = None
+) -> SavedUpload:
+    """
+    Stream src_file into the store under key, hashing it on the way (single pass). Raises
+    ValueError, and stores nothing, once more than max_bytes have been read.
+    """
+    writer = get_store(output_dir).writer(key)
+    try:
+        sha256, size = stream_and_hash(src_file, writer.write, max_bytes=max_bytes)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return SavedUpload(path=writer.ref, sha256=sha256, size_bytes=size)
+
+
+def publish_file(output_dir: str, key: str, local_path: str) -> str:
+    """
+    Move a finished local file (e.g. an assembled resumable upload) to its key in the store.
+    Returns the ref; the local file is gone afterwards unless it already was the object.
+    """
+    store = get_store(output_dir)
+    ref = store.ref(key)
+    if is_local_ref(ref):
+        if Path(ref).resolve() != Path(local_path).resolve():
+            ensure_dir(str(Path(ref).parent))
+            os.replace(local_path, ref)
+        return ref
+    with open(local_path, "rb") as f:
+        put = put_stream(output_dir, key, f)
+    Path(local_path).unlink(missing_ok=True)
+    return put.path
+
+
+def open_object(ref: str) -> BinaryIO:
+    return store_for_ref(ref).open(ref)
+
+
+def delete_object(ref: str) -> None:
+    store_for_ref(ref).delete(ref)
+
+
+@contextmanager
+def local_file(ref: str) -> Iterator[str]:
+    """
+    A filesystem path holding the object (ffmpeg and the provider SDKs need one). Local objects
+    are used in place; remote ones are streamed to a temporary file, removed on exit.
+    """
+    if is_local_ref(ref):
+        if not Path(ref).exists():
+            raise FileNotFoundError(ref)
+        yield ref
+        return
+    with tempfile.TemporaryDirectory(prefix="object_") as tmpdir:
+        # Keep the name: providers infer the audio format from the extension.
+        path = str(Path(tmpdir) / Path(parse_s3_ref(ref)[1]).name)
+        with closing(open_object(ref)) as src, open(path, "wb") as out:
+            shutil.copyfileobj(src, out, length=COPY_CHUNK_BYTES)
+        yield path
+
+
+def store_json(output_dir: str, payload: dict[str, Any]) -> StoredResult:
+    """
+    Store an /analyze result under results/ (sharded by day, see sharded_key) as
+    `<UTC timestamp>_<result_id>.json`. StoredResult.path is its ref.
+    """
+    result_id = uuid4().hex
+    now = datetime.now(UTC)
+    ts = now.strftime("%Y%m%dT%H%M%SZ")
+
+    # Normalize to plain JSON-serializable dict.
+    to_write = {
+        "result_id": result_id,
+        "created_at_utc": ts,
+        **payload,
+    }
+    body = (json.dumps(to_write, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+    writer = get_store(output_dir).writer(
+        sharded_key("results", now, result_id, f"{ts}_{result_id}.json")
+    )
+    try:
+        writer.write(body)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return StoredResult(result_id=result_id, path=writer.ref)
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import exists, func, literal_column, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import Job, Upload
+from .events import notify_job_event
+
+# Scheduling lanes, claimed strictly in this order (Job.priority).
+PRIORITIES = ("interactive", "bulk")
+_LANE_RANK = {p: i for i, p in enumerate(PRIORITIES)}
+
+# pg_advisory_xact_lock key serializing claims (any constant unique to this app).
+_CLAIM_LOCK_ID = 482_901_001
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    job_id: str
+    audio_path: str  # "" once retention deleted the recording (only the LLM stage is left)
+    attempts: int
+
+
+def upload_saved():
+    """
+    SQL condition: the job's upload finished (audio_path is set, or retention has since
+    deleted the recording and cleared it).
+    """
+    return or_(Job.audio_path.is_not(None), Job.audio_purged_at.is_not(None))
+
+
+@dataclass(frozen=True)
+class SchedulingPolicy:
+    """
+    How claim_next_job shares workers between tenants (source_id; jobs without one form the
+    tenant ""). Caps count leased jobs across all workers; 0 = unlimited.
+    """
+
+    tenant_weights: dict[str, float] = field(default_factory=dict)
+    tenant_max_running: int = 0
+    tenant_max_running_overrides: dict[str, int] = field(default_factory=dict)
+    bulk_max_running: int = 0
+
+    @classmethod
+    def from_settings(cls) -> SchedulingPolicy:
+        return cls(
+            tenant_weights=dict(settings.job_tenant_weights),
+            tenant_max_running=settings.job_tenant_max_running,
+            tenant_max_running_overrides=dict(settings.job_tenant_max_running_overrides),
+            bulk_max_running=settings.job_bulk_max_running,
+        )
+
+    def weight(self, tenant: str) -> float:
+        return max(float(self.tenant_weights.get(tenant, 1.0)), 1e-6)
+
+    def cap(self, tenant: str) -> int:
+        return self.tenant_max_running_overrides.get(tenant, self.tenant_max_running)
+
+
+@dataclass(frozen=True)
+class QueueHead:
+    """
+    The oldest runnable job of one (lane, tenant).
+    """
+
+    job_id: str
+    priority: str
+    tenant: str
+    created_at: datetime
+
+
+def order_candidates(
+    heads: list[QueueHead],
+    running: dict[tuple[str, str], int],
+    policy: SchedulingPolicy,
+) -> list[str]:
+    """
+    Job ids to try, best first. Interactive before bulk; within a lane, weighted fair share:
+    the tenant with the fewest running jobs per unit of weight goes first (ties: oldest job).
+    Tenants at their cap, and bulk jobs once bulk_max_running are leased, are left out.
+    running maps (priority, tenant) to leased jobs.
+    """
+    per_tenant: Counter[str] = Counter()
+    bulk_running = 0
+    for (priority, tenant), n in running.items():
+        per_tenant[tenant] += n
+        if priority == "bulk":
+            bulk_running += n
+
+    eligible = []
+    for h in heads:
+        cap = policy.cap(h.tenant)
+        if cap > 0 and per_tenant[h.tenant] >= cap:
+            continue
+        if h.priority == "bulk" and 0 < policy.bulk_max_running <= bulk_running:
+            continue
+        eligible.append(h)
+    eligible.sort(
+        key=lambda h: (
+            _LANE_RANK.get(h.priority, len(PRIORITIES)),
+            per_tenant[h.tenant] / policy.weight(h.tenant),
+            h.created_at,
+        )
+    )
+    return [h.job_id for h in eligible]
+
+
+def claim_next_job(
+    db: Session,
+    *,
+    worker_id: str,
+    lease_seconds: int,
+    max_attempts: int,
+    policy: SchedulingPolicy | None = None,
+) -> ClaimedJob | None:
+    """
+    Atomically claim the next runnable job under the scheduling policy (see order_candidates;
+    defaults to the JOB_* settings), so one tenant's bulk import can't starve the others.
+
+    A job is runnable when it is still `processing`, its upload has been saved
+    (see upload_saved) and nobody holds a live lease on it. Expired leases
+    (crashed worker) are reclaimed here too. Claims are serialized with a transaction-level
+    advisory lock, so shares and caps are computed on a consistent view; the rows themselves
+    are taken with FOR UPDATE SKIP LOCKED and never double-claimed.
+    """
+    policy = policy or SchedulingPolicy.from_settings()
+    now = datetime.now(UTC)
+    # Literals, not bound parameters, so even a generic (prepared) plan matches the
+    # ix_jobs_queue_heads_tenant expression and its WHERE clause.
+    tenant = func.coalesce(Job.source_id, literal_column("''"))
+    runnable = (
+        Job.status == literal_column("'processing'"),
+        upload_saved(),
+        or_(Job.locked_until.is_(None), Job.locked_until < now),
+    )
+    while True:
+        db.execute(select(func.pg_advisory_xact_lock(_CLAIM_LOCK_ID)))
+        heads = [
+            QueueHead(job_id=r[0], priority=r[1], tenant=r[2], created_at=r[3])
+            for r in db.execute(
+                select(Job.id, Job.priority, tenant, Job.created_at)
+                .where(*runnable)
+                .distinct(Job.priority, tenant)
+                .order_by(Job.priority, tenant, Job.created_at)
+            ).all()
+        ]
+        running = {
+            (priority, t): n
+            for priority, t, n in db.execute(
+                select(Job.priority, tenant, func.count())
+                .where(Job.status == "processing", Job.locked_until >= now)
+                .group_by(Job.priority, tenant)
+            ).all()
+        }
+
+        row = None
+        for job_id in order_candidates(heads, running, policy):
+            row = db.execute(
+                select(Job).where(Job.id == job_id, *runnable).with_for_update(skip_locked=True)
+            ).scalars().first()
+            if row is not None:
+                break
+        if row is None:
+            db.rollback()
+            return None
+
+        if row.attempts >= max_attempts:
+            # Leased too many times without finishing (e.g. it keeps crashing the worker).
+            _fail(db, row, row.error or f"Gave up after {row.attempts} attempts")
+            db.commit()
+            continue
+
+        row.attempts += 1
+        row.locked_by = worker_id
+        row.locked_until = now + timedelta(seconds=lease_seconds)
+        row.heartbeat_at = now
+        claimed = ClaimedJob(job_id=row.id, audio_path=row.audio_path or "", attempts=row.attempts)
+        db.commit()
+        return claimed
+
+
+def heartbeat(db: Session, *, job_id: str, worker_id: str, lease_seconds: int) -> bool:
+    """
+    Extend the lease on a job we hold. Returns False if the lease was lost.
+    """
+    now = datetime.now(UTC)
+    res = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id)
+        .values(heartbeat_at=now, locked_until=now + timedelta(seconds=lease_seconds))
+    )
+    db.commit()
+    return bool(res.rowcount)
+
+
+def release_job(db: Session, *, job_id: str, worker_id: str) -> None:
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id)
+        .values(locked_by=None, locked_until=None)
+    )
+    db.commit()
+
+
+def sweep_stale_jobs(
+    db: Session,
+    *,
+    upload_timeout_seconds: int,
+    max_attempts: int,
+    batch_size: int = 100,
+) -> dict[str, int]:
+    """
+    Recover jobs stuck in `processing` after a crash:
+
+    - upload never finished (no audio_path) and idle for upload_timeout_seconds -> failed;
+    - lease expired (worker died) and attempts are used up -> failed;
+    - lease expired otherwise -> lease cleared and stage reset to `uploaded`, so the job shows
+      as queued again and the next worker resumes it from its last checkpoint.
+
+    Safe to run from several processes at once (rows are locked with SKIP LOCKED).
+    """
+    now = datetime.now(UTC)
+    counts = {"abandoned_uploads": 0, "failed": 0, "requeued": 0}
+
+    cutoff = now - timedelta(seconds=upload_timeout_seconds)
+    abandoned = db.execute(
+        select(Job)
+        .where(
+            Job.status == "processing",
+            ~upload_saved(),
+            Job.created_at < cutoff,
+            # Resumable uploads count from their last received chunk.
+            ~exists().where(Upload.job_id == Job.id, Upload.updated_at >= cutoff),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for row in abandoned:
+        _fail(db, row, "Upload did not complete")
+        counts["abandoned_uploads"] += 1
+
+    expired = db.execute(
+        select(Job)
+        .where(
+            Job.status == "processing",
+            upload_saved(),
+            Job.locked_until.is_not(None),
+            Job.locked_until < now,
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for row in expired:
+        if row.attempts >= max_attempts:
+            _fail(db, row, row.error or f"Gave up after {row.attempts} attempts")
+            counts["failed"] += 1
+            continue
+        row.locked_by = None
+        row.locked_until = None
+        row.stage = "uploaded"
+        notify_job_event(
+            db, {"jobId": row.id, "status": row.status, "stage": row.stage, "error": row.error}
+        )
+        counts["requeued"] += 1
+
+    db.commit()
+    return counts
+
+
+def _fail(db: Session, row: Job, error: str) -> None:
+    row.status = "failed"
+    row.finished_at = datetime.now(UTC)
+    row.stage = "failed"
+    row.error = error
+    row.locked_by = None
+    row.locked_until = None
+    notify_job_event(
+        db, {"jobId": row.id, "status": row.status, "stage": row.stage, "error": row.error}
+    )
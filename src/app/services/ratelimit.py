@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+import openai
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import RateLimitBucket
+from ..db.session import SessionLocal
+from .metrics import provider_retries_total, rate_limit_wait_seconds
+
+T = TypeVar("T")
+
+# Longest single sleep while waiting for budget; the bucket is re-checked after each one.
+_MAX_POLL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class Budget:
+    """
+    One token bucket shared by every process: `per_minute` units refill continuously, up to one
+    minute's worth. A call takes `cost` units (1 per request, or estimated tokens).
+    """
+
+    key: str
+    per_minute: float
+    cost: float
+
+
+def chat_budgets(estimated_tokens: int) -> list[Budget]:
+    model = settings.openai_chat_model
+    return [
+        Budget(f"openai:{model}:requests", settings.openai_chat_rpm, 1),
+        Budget(f"openai:{model}:tokens", settings.openai_chat_tpm, estimated_tokens),
+    ]
+
+
+def transcription_budgets() -> list[Budget]:
+    model = settings.openai_transcription_model
+    return [Budget(f"openai:{model}:requests", settings.openai_transcription_rpm, 1)]
+
+
+def _try_take(db: Session, budgets: list[Budget]) -> float:
+    """
+    Take every budget's cost at once, or nothing. Returns 0 on success, else seconds to wait.
+    """
+    by_key = {b.key: b for b in budgets}
+    db.execute(
+        insert(RateLimitBucket)
+        .values(
+            [
+                {
+                    "key": b.key,
+                    "tokens": b.per_minute,
+                    "updated_at": func.now(),
+                    "blocked_until": None,
+                }
+                for b in budgets
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[RateLimitBucket.key])
+    )
+    now = db.execute(select(func.now())).scalar_one()
+    # Fixed lock order, so processes taking overlapping budgets can't deadlock.
+    rows = db.execute(
+        select(RateLimitBucket)
+        .where(RateLimitBucket.key.in_(sorted(by_key)))
+        .order_by(RateLimitBucket.key)
+        .with_for_update()
+    ).scalars().all()
+
+    wait = 0.0
+    for row in rows:
+        b = by_key[row.key]
+        elapsed = max(0.0, (now - row.updated_at).total_seconds())
+        row.tokens = min(b.per_minute, row.tokens + elapsed * b.per_minute / 60.0)
+        row.updated_at = now
+        if row.blocked_until is not None and row.blocked_until > now:
+            wait = max(wait, (row.blocked_until - now).total_seconds())
+        # A single call larger than the whole bucket waits for a full bucket instead of forever.
+        cost = min(b.cost, b.per_minute)
+        if row.tokens < cost:
+            wait = max(wait, (cost - row.tokens) * 60.0 / b.per_minute)
+    if wait <= 0:
+        for row in rows:
+            b = by_key[row.key]
+            row.tokens -= min(b.cost, b.per_minute)
+    db.commit()
+    return wait
+
+
+def acquire(budgets: list[Budget], *, operation: str) -> float:
+    """
+    Block until every (limited) budget has room, then take it. Returns seconds waited.
+    Budgets with per_minute <= 0 are unlimited and never touch the database.
+    """
+    budgets = [b for b in budgets if b.per_minute > 0]
+    if not budgets:
+        return 0.0
+    t0 = time.monotonic()
+    while True:
+        db = SessionLocal()
+        try:
+            wait = _try_take(db, budgets)
+        finally:
+            db.close()
+        if wait <= 0:
+            waited = time.monotonic() - t0
+            rate_limit_wait_seconds.observe(waited, operation=operation)
+            return waited
+        # Jitter so processes woken by the same refill don't all retry at once.
+        time.sleep(min(wait, _MAX_POLL_SECONDS) * random.uniform(1.0, 1.2))
+
+
+def block(budgets: list[Budget], seconds: float) -> None:
+    """
+    After a 429, pause every process using these budgets for `seconds` and empty the buckets.
+    """
+    keys = [b.key for b in budgets if b.per_minute > 0]
+    if not keys or seconds <= 0:
+        return
+    db = SessionLocal()
+    try:
+        until = datetime.now(UTC) + timedelta(seconds=seconds)
+        db.execute(
+            update(RateLimitBucket)
+            .where(RateLimitBucket.key.in_(keys))
+            .values(
+                tokens=0,
+                blocked_until=func.greatest(
+                    func.coalesce(RateLimitBucket.blocked_until, until), until
+                ),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(UTC)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (openai.APIConnectionError, openai.RateLimitError)):
+        return True  # includes APITimeoutError
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in (408, 409) or exc.status_code >= 500
+    return False
+
+
+def backoff_seconds(attempt: int, retry_after: float | None) -> float:
+    """
+    Retry-After if the provider sent one (plus a little jitter), else full-jitter exponential.
+    """
+    cap = settings.provider_backoff_max_seconds
+    if retry_after is not None:
+        return min(cap, retry_after) + random.uniform(0, 0.5)
+    return random.uniform(0, min(cap, settings.provider_backoff_base_seconds * 2**attempt))
+
+
+def call_with_backoff(fn: Callable[[], T], *, operation: str, budgets: list[Budget]) -> T:
+    """
+    Run one provider call under the shared rate limits, retrying 429 / 5xx / connection errors
+    up to PROVIDER_MAX_RETRIES times. Callers wait instead of failing while quota is exhausted.
+    """
+    attempt = 0
+    while True:
+        acquire(budgets, operation=operation)
+        try:
+            return fn()
+        except Exception as e:
+            if not _is_retryable(e) or attempt >= settings.provider_max_retries:
+                raise
+            delay = backoff_seconds(attempt, _retry_after_seconds(e))
+            if isinstance(e, openai.RateLimitError):
+                block(budgets, delay)
+            provider_retries_total.inc(operation=operation)
+            time.sleep(delay)
+            attempt += 1
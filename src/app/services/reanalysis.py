@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import Job, JobResult, ReanalysisRun
+from ..db.session import SessionLocal
+from .jobs import load_result_content, store_llm_result
+from .llm import PROMPT_VERSION, run_llm_on_transcript
+
+logger = logging.getLogger("app.reanalysis")
+
+_FILTER_KEYS = {"source_id", "created_from", "created_to", "job_ids", "include_current"}
+
+# Called with the run dict after every finished item.
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+
+def _parse_dt(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def normalize_filters(filters: dict[str, Any]) -> dict[str, Any]:
+    """
+    Validate a selection filter (JSON-serializable, stored on the run).
+
+    - source_id, created_from / created_to (ISO 8601), job_ids
+    - include_current: also redo results already on the current PROMPT_VERSION (default false)
+    """
+    unknown = set(filters) - _FILTER_KEYS
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}.")
+    out: dict[str, Any] = {}
+    if filters.get("source_id"):
+        out["source_id"] = str(filters["source_id"])
+    for k in ("created_from", "created_to"):
+        if filters.get(k):
+            v = filters[k]
+            try:
+                dt = v if isinstance(v, datetime) else datetime.fromisoformat(str(v))
+                out[k] = dt.isoformat()
+            except ValueError:
+                raise ValueError(f"Invalid {k} (expected ISO 8601).") from None
+    if filters.get("job_ids"):
+        out["job_ids"] = [str(j) for j in filters["job_ids"]]
+    out["include_current"] = bool(filters.get("include_current", False))
+    return out
+
+
+def _selection(filters: dict[str, Any], prompt_version: str, *, since: datetime | None = None):
+    """
+    Completed jobs (with a stored transcript) matching filters, ordered by job id.
+    With include_current, results rewritten on prompt_version at or after since (by this run,
+    before it was interrupted) are left out, so a resumed batch does not redo or recount them.
+    """
+    stmt = (
+        select(JobResult.job_id)
+        .join(Job, Job.id == JobResult.job_id)
+        .where(
+            Job.status == "completed",
+            or_(JobResult.transcript.is_not(None), JobResult.transcript_blob.is_not(None)),
+        )
+    )
+    if not filters.get("include_current"):
+        stmt = stmt.where(JobResult.prompt_version.is_distinct_from(prompt_version))
+    elif since is not None:
+        stmt = stmt.where(
+            or_(
+                JobResult.prompt_version.is_distinct_from(prompt_version),
+                JobResult.created_at < since,
+            )
+        )
+    if filters.get("source_id"):
+        stmt = stmt.where(Job.source_id == filters["source_id"])
+    if filters.get("created_from"):
+        stmt = stmt.where(Job.created_at >= _parse_dt(filters["created_from"]))
+    if filters.get("created_to"):
+        stmt = stmt.where(Job.created_at < _parse_dt(filters["created_to"]))
+    if filters.get("job_ids"):
+        stmt = stmt.where(JobResult.job_id.in_(filters["job_ids"]))
+    return stmt
+
+
+def run_to_dict(run: ReanalysisRun) -> dict[str, Any]:
+    return {
+        "id": run.id,
+        "createdAt": run.created_at.isoformat(),
+        "updatedAt": run.updated_at.isoformat(),
+        "status": run.status,
+        "promptVersion": run.prompt_version,
+        "filters": run.filters,
+        "concurrency": run.concurrency,
+        "total": run.total,
+        "done": run.done,
+        "failed": run.failed,
+        "lastError": run.last_error,
+    }
+
+
+def create_reanalysis_run(
+    db: Session, *, filters: dict[str, Any], concurrency: int
+) -> dict[str, Any]:
+    """
+    Record a pending run. Workers pick it up (see claim_reanalysis_run), or the CLI runs it.
+    """
+    filters = normalize_filters(filters)
+    total = db.execute(
+        select(func.count()).select_from(_selection(filters, PROMPT_VERSION).subquery())
+    ).scalar_one()
+    now = datetime.now(UTC)
+    run = ReanalysisRun(
+        id=f"rr_{uuid4().hex}",
+        created_at=now,
+        updated_at=now,
+        status="pending" if total else "completed",
+        prompt_version=PROMPT_VERSION,
+        filters=filters,
+        concurrency=max(1, concurrency),
+        total=total,
+        done=0,
+        failed=0,
+    )
+    db.add(run)
+    db.commit()
+    return run_to_dict(run)
+
+
+def get_reanalysis_run(db: Session, run_id: str) -> ReanalysisRun:
+    run = db.get(ReanalysisRun, run_id)
+    if run is None:
+        raise FileNotFoundError(run_id)
+    return run
+
+
+def cancel_reanalysis_run(db: Session, run_id: str) -> dict[str, Any]:
+    """
+    Stop a run after its current batch; already re-analyzed results are kept.
+    """
+    run = get_reanalysis_run(db, run_id)
+    if run.status in ("pending", "running"):
+        run.status = "cancelled"
+        run.updated_at = datetime.now(UTC)
+        db.commit()
+    return run_to_dict(run)
+
+
+def claim_reanalysis_run(
+    db: Session, *, worker_id: str, lease_seconds: int, run_id: str | None = None
+) -> str | None:
+    """
+    Lease a pending run, or a running one whose owner stopped renewing (interrupted).
+    """
+    now = datetime.now(UTC)
+    stmt = (
+        select(ReanalysisRun)
+        .where(
+            ReanalysisRun.status.in_(("pending", "running")),
+            or_(ReanalysisRun.locked_until.is_(None), ReanalysisRun.locked_until < now),
+        )
+        .order_by(ReanalysisRun.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if run_id is not None:
+        stmt = stmt.where(ReanalysisRun.id == run_id)
+    run = db.execute(stmt).scalars().first()
+    if run is None:
+        db.rollback()
+        return None
+    run.status = "running"
+    run.locked_by = worker_id
+    run.locked_until = now + timedelta(seconds=lease_seconds)
+    run.updated_at = now
+    claimed = run.id
+    db.commit()
+    return claimed
+
+
+def renew_reanalysis_lease(db: Session, *, run_id: str, worker_id: str, lease_seconds: int) -> bool:
+    """
+    Extend the lease on a run we hold. Returns False if the lease was lost.
+    """
+    now = datetime.now(UTC)
+    res = db.execute(
+        update(ReanalysisRun)
+        .where(ReanalysisRun.id == run_id, ReanalysisRun.locked_by == worker_id)
+        .values(locked_until=now + timedelta(seconds=lease_seconds))
+    )
+    db.commit()
+    return bool(res.rowcount)
+
+
+def _heartbeat_loop(
+    run_id: str, worker_id: str, lease_seconds: int, done: threading.Event
+) -> None:
+    # Keeps the lease while a batch's LLM calls run (they can outlast it with map-reduce and
+    # rate-limit waits); otherwise another worker would reclaim the run and redo the batch.
+    while not done.wait(settings.job_heartbeat_seconds):
+        db: Session = SessionLocal()
+        try:
+            if not renew_reanalysis_lease(
+                db, run_id=run_id, worker_id=worker_id, lease_seconds=lease_seconds
+            ):
+                logger.warning("lost lease on reanalysis run %s", run_id)
+                return
+        except Exception:
+            logger.exception("heartbeat failed for reanalysis run %s", run_id)
+        finally:
+            db.close()
+
+
+def reanalyze_job(job_id: str, *, use_cache: bool = True) -> None:
+    """
+    Re-run only the LLM stage for one job on its stored transcript.
+    """
+    db: Session = SessionLocal()
+    try:
+        row = db.get(JobResult, job_id)
+        if row is None:
+            raise FileNotFoundError(job_id)
+        transcript = load_result_content(db, row)["transcript"] or ""
+        llm = run_llm_on_transcript(transcript, use_cache=use_cache)
+        store_llm_result(db, row, llm)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _record_item(
+    run_id: str, worker_id: str, lease_seconds: int, error: str | None
+) -> dict[str, Any] | None:
+    # One short transaction per item: progress is visible immediately and renews the lease.
+    db: Session = SessionLocal()
+    try:
+        now = datetime.now(UTC)
+        values: dict[str, Any] = {
+            "updated_at": now,
+            "locked_until": now + timedelta(seconds=lease_seconds),
+        }
+        if error is None:
+            values["done"] = ReanalysisRun.done + 1
+        else:
+            values["failed"] = ReanalysisRun.failed + 1
+            values["last_error"] = error[:2000]
+        db.execute(
+            update(ReanalysisRun)
+            .where(ReanalysisRun.id == run_id, ReanalysisRun.locked_by == worker_id)
+            .values(**values)
+        )
+        db.commit()
+        run = db.get(ReanalysisRun, run_id)
+        return run_to_dict(run) if run is not None else None
+    finally:
+        db.close()
+
+
+def execute_reanalysis_run(
+    run_id: str,
+    *,
+    worker_id: str,
+    lease_seconds: int,
+    batch_size: int = 20,
+    on_progress: ProgressCallback | None = None,
+    stop: threading.Event | None = None,
+) -> str:
+    """
+    Process a run this worker has claimed, in job-id order, `concurrency` jobs at a time.
+
+    The cursor is saved after each batch, so an interrupted run resumes at the batch it was
+    in; results that batch already finished have the new prompt_version and are skipped.
+    The lease is renewed every JOB_HEARTBEAT_SECONDS while the run executes.
+    Returns the run's final status ("completed", "cancelled", or "running" if stopped).
+    """
+    db: Session = SessionLocal()
+    try:
+        run = get_reanalysis_run(db, run_id)
+        filters, target, concurrency = dict(run.filters), run.prompt_version, run.concurrency
+        since = run.created_at
+        if target != PROMPT_VERSION:
+            # Prompts changed again since the run was created: finish on the current version.
+            run.prompt_version = target = PROMPT_VERSION
+            db.commit()
+    finally:
+        db.close()
+
+    def _one(job_id: str) -> None:
+        error = None
+        try:
+            # Redoing current-version results means the cached answer is not wanted.
+            reanalyze_job(job_id, use_cache=not filters.get("include_current"))
+        except Exception as e:
+            logger.warning("reanalysis of %s failed: %s", job_id, e)
+            error = f"{job_id}: {e}"
+        progress = _record_item(run_id, worker_id, lease_seconds, error)
+        if on_progress is not None and progress is not None:
+            on_progress(progress)
+
+    done = threading.Event()
+    hb = threading.Thread(
+        target=_heartbeat_loop, args=(run_id, worker_id, lease_seconds, done), daemon=True
+    )
+    hb.start()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reanalyze") as pool:
+            while True:
+                db = SessionLocal()
+                try:
+                    run = get_reanalysis_run(db, run_id)
+                    if run.status != "running" or run.locked_by != worker_id:
+                        return run.status
+                    if stop is not None and stop.is_set():
+                        run.locked_by = None
+                        run.locked_until = None
+                        db.commit()
+                        return run.status
+                    stmt = (
+                        _selection(filters, target, since=since)
+                        .order_by(JobResult.job_id)
+                        .limit(batch_size)
+                    )
+                    if run.cursor:
+                        stmt = stmt.where(JobResult.job_id > run.cursor)
+                    batch = list(db.execute(stmt).scalars().all())
+                finally:
+                    db.close()
+
+                if batch:
+                    list(pool.map(_one, batch))
+
+                db = SessionLocal()
+                try:
+                    run = get_reanalysis_run(db, run_id)
+                    if run.locked_by != worker_id:
+                        return run.status
+                    run.updated_at = datetime.now(UTC)
+                    if batch:
+                        run.cursor = batch[-1]
+                    elif run.status == "running":
+                        run.status = "completed"
+                        run.locked_by = None
+                        run.locked_until = None
+                    db.commit()
+                    if not batch:
+                        return run.status
+                finally:
+                    db.close()
+    finally:
+        done.set()
+        hb.join()
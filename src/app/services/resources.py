@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import threading
+
+import httpx
+from openai import OpenAI
+
+from ..core.config import settings
+from ..db.session import engine
+from .executor import shutdown_executor
+from .metrics import on_provider_response
+
+# Process-wide, long-lived provider clients. One keep-alive HTTP connection pool per process
+# instead of a new client (and TLS handshake) per transcription / chat call.
+_lock = threading.Lock()
+_openai_client: OpenAI | None = None
+_http_client: httpx.Client | None = None
+
+
+def get_openai_client() -> OpenAI:
+    global _openai_client, _http_client
+    if _openai_client is not None:
+        return _openai_client
+    with _lock:
+        if _openai_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                ),
+                timeout=httpx.Timeout(settings.http_timeout_seconds, connect=10.0),
+                event_hooks=(
+                    {"response": [on_provider_response]}
+                    if settings.metrics_enabled
+                    else None
+                ),
+            )
+            # Retries are done by services/ratelimit.py, which also coordinates them across
+            # processes.
+            _openai_client = OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                http_client=_http_client,
+                max_retries=0,
+            )
+        return _openai_client
+
+
+def shutdown_resources() -> None:
+    """
+    Close pooled clients and connections. Call once on process shutdown.
+    """
+    global _openai_client, _http_client
+    with _lock:
+        if _openai_client is not None:
+            _openai_client.close()
+        _openai_client = None
+        _http_client = None
+    shutdown_executor()
+    engine.dispose()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+import re
+import shutil
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import Job, Upload
+from .blobs import purge_unreferenced_blobs
+from .metrics import retention_deleted_total
+from .objectstore import S3_SCHEME, delete_object, get_store, key_day
+from .uploads import part_paths
+
+logger = logging.getLogger("app.retention")
+
+# /analyze results written before results/ was sharded: OUTPUT_DIR/<ts>_<result_id>.json
+_LEGACY_RESULT = re.compile(r"^(\d{8})T\d{6}Z_[0-9a-f]{32}\.json$")
+
+# Most batches one high-water pass deletes before giving the disk back to the next pass.
+_MAX_EAGER_BATCHES = 10
+
+# Blobs written this recently are never purged, even if nothing references them yet.
+_BLOB_GRACE = timedelta(hours=1)
+
+
+def purge_job_audio(
+    db: Session,
+    *,
+    finished_before: datetime | None,
+    batch_size: int,
+    local_only: bool = False,
+) -> int:
+    """
+    Delete the recordings of up to batch_size finished (completed or failed) jobs, oldest
+    finished first, and clear their audio_path. Results and transcripts are kept.
+    finished_before=None ignores age (high-water cleanup); local_only skips s3:// objects.
+    """
+    stmt = (
+        select(Job)
+        .where(
+            Job.status.in_(("completed", "failed")),
+            Job.audio_path.is_not(None),
+            Job.finished_at.is_not(None),
+        )
+        .order_by(Job.finished_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    if finished_before is not None:
+        stmt = stmt.where(Job.finished_at < finished_before)
+    if local_only:
+        stmt = stmt.where(Job.audio_path.not_like(f"{S3_SCHEME}%"))
+    rows = db.execute(stmt).scalars().all()
+
+    now = datetime.now(UTC)
+    purged = 0
+    for row in rows:
+        try:
+            delete_object(row.audio_path)
+        except Exception as e:
+            # Left in place (still referenced) and retried on the next pass.
+            logger.warning("could not delete audio of %s: %s", row.id, e)
+            continue
+        row.audio_path = None
+        row.audio_purged_at = now
+        purged += 1
+    db.commit()
+    retention_deleted_total.inc(purged, kind="audio")
+    return purged
+
+
+def purge_abandoned_uploads(db: Session, *, batch_size: int) -> int:
+    """
+    Delete partial resumable uploads (and their chunk part files) whose job was failed by the
+    stale-job sweeper. The files are on the disk of the API node that received them, so the API
+    runs this, not the workers. A row is marked expired only once its files are gone; one that
+    could not be deleted is retried on the next pass.
+    """
+    rows = db.execute(
+        select(Upload)
+        .join(Job, Job.id == Upload.job_id)
+        .where(Upload.status == "open", Job.status == "failed")
+        .limit(batch_size)
+        .with_for_update(of=Upload, skip_locked=True)
+    ).scalars().all()
+    now = datetime.now(UTC)
+    purged = 0
+    for row in rows:
+        try:
+            for p in (Path(row.path), *part_paths(row.path)):
+                p.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("could not delete partial upload %s: %s", row.id, e)
+            continue
+        row.status = "expired"
+        row.updated_at = now
+        purged += 1
+    db.commit()
+    retention_deleted_total.inc(purged, kind="upload")
+    return purged
+
+
+def purge_expired_results(output_dir: str, *, older_than: datetime, limit: int) -> int:
+    """
+    Delete up to limit /analyze results filed on a day before older_than. Keys are listed in
+    day order, so only the expired days are read.
+    """
+    store = get_store(output_dir)
+    cutoff_day = older_than.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    deleted = 0
+    for key in store.iter_keys("results/"):
+        day = key_day(key)
+        if day is None:
+            continue
+        if day >= cutoff_day or deleted >= limit:
+            break
+        store.delete(store.ref(key))
+        deleted += 1
+
+    if store.name == "local" and deleted < limit:
+        for p in sorted(Path(output_dir).glob("*.json")):
+            m = _LEGACY_RESULT.match(p.name)
+            if m is None:
+                continue
+            day = datetime.strptime(m.group(1), "%Y%m%d").replace(tzinfo=UTC)
+            if day >= cutoff_day or deleted >= limit:
+                break
+            p.unlink(missing_ok=True)
+            deleted += 1
+
+    retention_deleted_total.inc(deleted, kind="result")
+    return deleted
+
+
+def disk_usage_percent(path: str) -> float:
+    usage = shutil.disk_usage(path)
+    return 100.0 * usage.used / usage.total if usage.total else 0.0
+
+
+def run_retention(db: Session, output_dir: str) -> dict[str, int]:
+    """
+    One bounded garbage-collection pass (each step deletes at most RETENTION_GC_BATCH_SIZE):
+
+    - recordings of jobs finished more than RETENTION_AUDIO_DAYS ago;
+    - /analyze results older than RETENTION_RESULTS_DAYS;
+    - result blobs no longer referenced by any result (replaced deliverables, transcripts);
+    - above DISK_HIGH_WATER_PERCENT of OUTPUT_DIR's disk, finished jobs' local recordings,
+      oldest first and regardless of age, until usage is under DISK_LOW_WATER_PERCENT.
+
+    A retention setting of 0 keeps that kind forever. Safe to run from several processes.
+    Partial uploads are purged by the API instead (see purge_abandoned_uploads).
+    """
+    now = datetime.now(UTC)
+    batch = settings.retention_gc_batch_size
+    counts = {"audio": 0, "results": 0, "blobs": 0, "eager_audio": 0}
+
+    if settings.retention_audio_days > 0:
+        counts["audio"] = purge_job_audio(
+            db,
+            finished_before=now - timedelta(days=settings.retention_audio_days),
+            batch_size=batch,
+        )
+    if settings.retention_results_days > 0:
+        counts["results"] = purge_expired_results(
+            output_dir,
+            older_than=now - timedelta(days=settings.retention_results_days),
+            limit=batch,
+        )
+    counts["blobs"] = purge_unreferenced_blobs(
+        db, written_before=now - _BLOB_GRACE, batch_size=batch
+    )
+    retention_deleted_total.inc(counts["blobs"], kind="blob")
+
+    high = settings.disk_high_water_percent
+    if high > 0 and Path(output_dir).exists() and disk_usage_percent(output_dir) >= high:
+        low = min(settings.disk_low_water_percent, high)
+        logger.warning("disk usage above %.0f%%, deleting finished jobs' audio", high)
+        for _ in range(_MAX_EAGER_BATCHES):
+            purged = purge_job_audio(db, finished_before=None, batch_size=batch, local_only=True)
+            counts["eager_audio"] += purged
+            if not purged or disk_usage_percent(output_dir) < low:
+                break
+    return counts
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..db.models import SEARCH_TEXT_CONFIG, Job, JobResult, SegmentIndex
+
+
+def index_result_for_search(
+    db: Session, row: JobResult, transcript: str, segments: list[dict] | None
+) -> None:
+    """
+    Refresh the full-text index for one result: the whole-transcript tsvector on job_results
+    plus one row per segment in segment_index. Runs in the caller's transaction.
+    """
+    row.search_vector = func.to_tsvector(SEARCH_TEXT_CONFIG, transcript or "")
+    db.execute(delete(SegmentIndex).where(SegmentIndex.job_id == row.job_id))
+    rows = [
+        {
+            "job_id": row.job_id,
+            "seq": i,
+            "start": s.get("start"),
+            "end": s.get("end"),
+            "text": s.get("text") or "",
+        }
+        for i, s in enumerate(segments or [])
+        if (s.get("text") or "").strip()
+    ]
+    if rows:
+        # segment_index.tsv is a generated column.
+        db.execute(insert(SegmentIndex.__table__), rows)
+
+
+def search_transcripts(
+    db: Session, q: str, *, limit: int = 20, hits_per_job: int = 5
+) -> list[dict[str, Any]]:
+    """
+    Rank jobs by transcript relevance to q (websearch syntax: quotes, OR, -exclude) and attach
+    the best-matching segments with their start/end times.
+    """
+    query = func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, q)
+
+    rank = func.ts_rank_cd(JobResult.search_vector, query).label("rank")
+    job_rows = db.execute(
+        select(
+            Job.id,
+            Job.created_at,
+            Job.file_name,
+            Job.source_id,
+            Job.status,
+            rank,
+        )
+        .join(JobResult, JobResult.job_id == Job.id)
+        .where(JobResult.search_vector.op("@@")(query))
+        .order_by(rank.desc(), Job.created_at.desc())
+        .limit(limit)
+    ).all()
+    if not job_rows:
+        return []
+
+    job_ids = [r.id for r in job_rows]
+    seg_rank = func.ts_rank_cd(SegmentIndex.tsv, query)
+    numbered = (
+        select(
+            SegmentIndex.job_id,
+            SegmentIndex.start,
+            SegmentIndex.end,
+            SegmentIndex.text,
+            seg_rank.label("rank"),
+            func.row_number()
+            .over(partition_by=SegmentIndex.job_id, order_by=seg_rank.desc())
+            .label("n"),
+        )
+        .where(SegmentIndex.job_id.in_(job_ids), SegmentIndex.tsv.op("@@")(query))
+        .subquery()
+    )
+    seg_rows = db.execute(
+        select(numbered)
+        .where(numbered.c.n <= hits_per_job)
+        .order_by(numbered.c.job_id, numbered.c.start)
+    ).all()
+
+    hits: dict[str, list[dict[str, Any]]] = {}
+    for s in seg_rows:
+        hits.setdefault(s.job_id, []).append(
+            {"start": s.start, "end": s.end, "text": s.text, "rank": float(s.rank)}
+        )
+
+    return [
+        {
+            "jobId": r.id,
+            "createdAt": r.created_at.isoformat(),
+            "fileName": r.file_name,
+            "sourceId": r.source_id,
+            "status": r.status,
+            "rank": float(r.rank),
+            "segments": hits.get(r.id, []),
+        }
+        for r in job_rows
+    ]
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+from collections.abc import Callable
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
@@ -15,6 +16,60 @@ class StoredResult:
     path: str
 
 
+@dataclass(frozen=True)
+class SavedUpload:
+    path: str
+    sha256: str
+    size_bytes: int
+
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def copy_and_hash(src_file, dest_path: str, *, max_bytes: int | None = None) -> SavedUpload:
+    """
+    Stream src_file to dest_path, computing its SHA-256 on the way (single pass).
+    Raises ValueError (and removes the partial file) once more than max_bytes have been read.
+    """
+    ensure_dir(str(Path(dest_path).parent))
+    try:
+        with open(dest_path, "wb") as out:
+            sha256, size = stream_and_hash(src_file, out.write, max_bytes=max_bytes)
+    except ValueError:
+        Path(dest_path).unlink(missing_ok=True)
+        raise
+    return SavedUpload(path=dest_path, sha256=sha256, size_bytes=size)
+
+
+def stream_and_hash(
+    src_file, write: Callable[[bytes], Any], *, max_bytes: int | None = None
+) -> tuple[str, int]:
+    """
+    Copy src_file to write() in COPY_CHUNK_BYTES pieces; returns (SHA-256, size).
+    Raises ValueError once more than max_bytes have been read.
+    """
+    h = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = src_file.read(COPY_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            raise ValueError(f"File is larger than the {max_bytes} byte limit.")
+        h.update(chunk)
+        write(chunk)
+    return h.hexdigest(), size
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def ensure_dir(path: str) -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
 
@@ -22,11 +77,17 @@ def ensure_dir(path: str) -> None:
 def write_json_file(path: str, payload: dict[str, Any]) -> None:
     out_path = Path(path)
     ensure_dir(str(out_path.parent))
-    tmp_path = str(out_path) + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-        f.write("\n")
-    os.replace(tmp_path, out_path)
+    # Unique per call: concurrent writers of the same path (e.g. two jobs filling one cache
+    # entry) must not share a temp file. The last rename wins; readers never see a torn file.
+    tmp_path = f"{out_path}.{uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
 
 
 def read_json_file(path: str) -> dict[str, Any]:
@@ -35,26 +96,3 @@ def read_json_file(path: str) -> dict[str, Any]:
     if not isinstance(val, dict):
         raise ValueError("JSON file did not contain an object")
     return val
-
-
-def store_json(output_dir: str, payload: dict[str, Any]) -> StoredResult:
-    ensure_dir(output_dir)
-
-    result_id = uuid4().hex
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    filename = f"{ts}_{result_id}.json"
-    out_path = Path(output_dir) / filename
-
-    # Normalize to plain JSON-serializable dict.
-    to_write = {
-        "result_id": result_id,
-        "created_at_utc": ts,
-        **payload,
-    }
-
-    write_json_file(str(out_path), to_write)
-
-    return StoredResult(result_id=result_id, path=str(out_path))
-
-
-
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import shutil
+import subprocess
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import cache
 from pathlib import Path
+from typing import Any, Protocol
 
-from openai import OpenAI
+from openai import BadRequestError, OpenAI
 
 from ..core.config import settings
+from .cache import JsonDiskCache, cache_key
+from .executor import run_blocking
+from .metrics import provider_errors_total
+from .ratelimit import call_with_backoff, transcription_budgets
+from .resources import get_openai_client
+from .storage import sha256_file
 
 
 @dataclass(frozen=True)
@@ -14,87 +27,534 @@ class TranscriptionResult:
     segments: list[dict] | None
     provider: str
     model: str
+    cached: bool = False
 
 
 MAX_OPENAI_AUDIO_BYTES = 25 * 1024 * 1024  # 25MB (typical API limit)
 
 
-def transcribe_audio(file_path: str) -> TranscriptionResult:
+@dataclass(frozen=True)
+class AudioWindow:
+    index: int
+    start: float  # seconds from the start of the recording
+    duration: float
+
+
+# Called with (window index, window count, text) for each window of a split recording, in
+# order, as soon as it and every earlier window are transcribed. Text already heard in the
+# previous window's overlap is dropped.
+WindowCallback = Callable[[int, int, str], None]
+
+
+class TranscriptionProvider(Protocol):
+    """
+    A transcription backend. Implementations return (transcript, segments) for a local file.
+    Providers that transcribe in windows may report each one through on_window.
+    """
+
+    name: str
+
+    @property
+    def model(self) -> str: ...
+
+    def transcribe(
+        self, file_path: str, *, on_window: WindowCallback | None = None
+    ) -> tuple[str, list[dict] | None]: ...
+
+
+class OpenAITranscriptionProvider:
+    """
+    OpenAI audio transcription API. Long or large recordings are split into overlapping windows
+    (ffmpeg), transcribed concurrently and stitched back together with absolute timestamps.
+    """
+
+    name = "openai"
+
+    @property
+    def model(self) -> str:
+        return settings.openai_transcription_model
+
+    def transcribe(
+        self, file_path: str, *, on_window: WindowCallback | None = None
+    ) -> tuple[str, list[dict] | None]:
+        if not settings.openai_api_key:
+            raise RuntimeError("OpenAI transcription requires OPENAI_API_KEY")
+        client = get_openai_client()
+        size_bytes = Path(file_path).stat().st_size
+        duration = probe_duration_seconds(file_path)
+
+        needs_split = size_bytes > MAX_OPENAI_AUDIO_BYTES or (
+            duration is not None and duration > settings.transcription_chunk_seconds
+        )
+        if needs_split:
+            if duration is None:
+                raise ValueError(
+                    f"Audio file too large for hosted transcription: {size_bytes} bytes. "
+                    f"Please keep it under {MAX_OPENAI_AUDIO_BYTES} bytes (~25MB), or install "
+                    "ffmpeg/ffprobe so long recordings can be split automatically."
+                )
+            return _transcribe_chunked(client, file_path, duration, on_window=on_window)
+        return _transcribe_file_openai(client, file_path)
+
+
+class LocalWhisperProvider:
+    """
+    On-CPU transcription with faster-whisper (CTranslate2, int8 by default).
+    The model is loaded once per process and shared by all threads.
+    """
+
+    name = "local"
+
+    @property
+    def model(self) -> str:
+        return (
+            f"faster-whisper-{settings.local_whisper_model}"
+            f"-{settings.local_whisper_compute_type}"
+        )
+
+    def transcribe(
+        self, file_path: str, *, on_window: WindowCallback | None = None
+    ) -> tuple[str, list[dict] | None]:
+        model = _load_local_whisper(
+            settings.local_whisper_model,
+            settings.local_whisper_compute_type,
+            settings.local_whisper_threads,
+        )
+        raw_segments, _info = model.transcribe(
+            file_path,
+            beam_size=settings.local_whisper_beam_size,
+            vad_filter=True,
+        )
+        segments = [
+            {"start": float(s.start), "end": float(s.end), "text": s.text or ""}
+            for s in raw_segments
+        ]
+        transcript = " ".join(s["text"].strip() for s in segments if s["text"].strip())
+        return transcript, segments
+
+
+class StubTranscriptionProvider:
+    """
+    Deterministic stub so the rest of the pipeline runs without any provider configured.
     """
-    Transcribe audio at file_path.
 
-    - If OPENAI_API_KEY is set: uses OpenAI audio transcription API.
-    - Otherwise: returns a deterministic stub transcript (so the API remains runnable).
+    name = "stub"
+    model = "stub"
+
+    def transcribe(
+        self, file_path: str, *, on_window: WindowCallback | None = None
+    ) -> tuple[str, list[dict] | None]:
+        return (
+            "STUB_TRANSCRIPT: OpenAI is not configured (OPENAI_API_KEY missing). "
+            "Upload received and saved; replace this with real transcription by setting the key.",
+            None,
+        )
+
+
+_PROVIDERS: dict[str, TranscriptionProvider] = {
+    "openai": OpenAITranscriptionProvider(),
+    "local": LocalWhisperProvider(),
+    "stub": StubTranscriptionProvider(),
+}
+
+
+def register_transcription_provider(provider: TranscriptionProvider) -> None:
+    _PROVIDERS[provider.name] = provider
+
+
+def get_transcription_provider(name: str | None = None) -> TranscriptionProvider:
+    """
+    Resolve a provider by name (default: TRANSCRIPTION_PROVIDER). "auto" means OpenAI when
+    OPENAI_API_KEY is set, otherwise the stub.
+    """
+    name = (name or settings.transcription_provider or "auto").strip().lower()
+    if name == "auto":
+        name = "openai" if settings.openai_api_key else "stub"
+    try:
+        return _PROVIDERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown transcription provider {name!r}. Available: {', '.join(_PROVIDERS)}"
+        ) from None
+
+
+@cache
+def _load_local_whisper(model_size: str, compute_type: str, threads: int):
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as e:
+        raise RuntimeError(
+            "TRANSCRIPTION_PROVIDER=local requires the faster-whisper package "
+            "(pip install faster-whisper)"
+        ) from e
+    return WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=threads)
+
+
+def warm_up_transcription_provider() -> None:
+    """
+    Load heavyweight models up front (e.g. at worker start) instead of on the first job.
+    """
+    for provider in {get_transcription_provider(), *_fallback_providers()}:
+        if isinstance(provider, LocalWhisperProvider):
+            _load_local_whisper(
+                settings.local_whisper_model,
+                settings.local_whisper_compute_type,
+                settings.local_whisper_threads,
+            )
+
+
+def _fallback_providers() -> list[TranscriptionProvider]:
+    name = (settings.transcription_fallback_provider or "").strip()
+    return [get_transcription_provider(name)] if name else []
+
+
+def transcription_providers() -> list[TranscriptionProvider]:
+    """
+    The configured provider followed by TRANSCRIPTION_FALLBACK_PROVIDER, if any.
+    """
+    return [get_transcription_provider(), *_fallback_providers()]
+
+
+def transcription_from_cache(
+    hit: dict[str, Any], provider: TranscriptionProvider
+) -> TranscriptionResult:
+    return TranscriptionResult(
+        transcript=hit.get("transcript") or "",
+        segments=hit.get("segments"),
+        provider=hit.get("provider") or provider.name,
+        model=hit.get("model") or provider.model,
+        cached=True,
+    )
+
+
+def transcribe_audio(
+    file_path: str,
+    *,
+    audio_sha256: str | None = None,
+    on_window: WindowCallback | None = None,
+    use_cache: bool = True,
+) -> TranscriptionResult:
+    """
+    Transcribe audio at file_path with the configured provider (TRANSCRIPTION_PROVIDER).
+
+    - "openai": OpenAI audio transcription API (the default when OPENAI_API_KEY is set).
+    - "local": faster-whisper on CPU.
+    - "stub": a deterministic stub transcript (the default without a key).
+
+    If the provider fails and TRANSCRIPTION_FALLBACK_PROVIDER is set, that provider is tried.
+    Real results are cached by (audio SHA-256, model); pass audio_sha256 if it is already known,
+    or use_cache=False when the caller caches the result itself.
+    on_window receives each window of a split recording as it is transcribed (not called for
+    cache hits or unsplit files, and possibly only partly if the provider then fails).
     """
     p = Path(file_path)
     if not p.exists():
         raise FileNotFoundError(file_path)
 
-    if settings.openai_api_key:
-        size_bytes = p.stat().st_size
-        if size_bytes > MAX_OPENAI_AUDIO_BYTES:
-            raise ValueError(
-                f"Audio file too large for hosted transcription: {size_bytes} bytes. "
-                f"Please keep it under {MAX_OPENAI_AUDIO_BYTES} bytes (~25MB), or split/compress it, "
-                "or switch to local Whisper."
-            )
-        client = OpenAI(api_key=settings.openai_api_key)
-        segments: list[dict] | None = None
-        with open(p, "rb") as f:
-            # Try to get timestamped segments (time-based transcript).
-            try:
-                resp = client.audio.transcriptions.create(
-                    model=settings.openai_transcription_model,
-                    file=f,
-                    response_format="verbose_json",
-                    timestamp_granularities=["segment"],
-                )
-                transcript = getattr(resp, "text", None) or ""
-                raw_segments = getattr(resp, "segments", None)
-                if isinstance(raw_segments, list):
-                    norm: list[dict] = []
-                    for s in raw_segments:
-                        if isinstance(s, dict):
-                            norm.append(
-                                {
-                                    "start": s.get("start"),
-                                    "end": s.get("end"),
-                                    "text": s.get("text") or "",
-                                }
-                            )
-                        else:
-                            norm.append(
-                                {
-                                    "start": getattr(s, "start", None),
-                                    "end": getattr(s, "end", None),
-                                    "text": getattr(s, "text", "") or "",
-                                }
-                            )
-                    segments = norm
-            except Exception:
-                # Fallback to plain text transcript.
-                f.seek(0)
-                resp = client.audio.transcriptions.create(
-                    model=settings.openai_transcription_model,
-                    file=f,
-                )
-                transcript = getattr(resp, "text", None) or ""
-        return TranscriptionResult(
+    providers = transcription_providers()
+    use_cache = use_cache and settings.transcription_cache_enabled and providers[0].name != "stub"
+    cache = transcription_cache() if use_cache else None
+    digest = (audio_sha256 or sha256_file(str(p))) if cache is not None else ""
+
+    last_error: Exception | None = None
+    for provider in providers:
+        key = cache_key("transcription", digest, provider.model) if cache is not None else ""
+        if cache is not None and provider.name != "stub":
+            hit = cache.get(key)
+            if hit is not None:
+                return transcription_from_cache(hit, provider)
+        try:
+            if on_window is not None:
+                transcript, segments = provider.transcribe(str(p), on_window=on_window)
+            else:
+                transcript, segments = provider.transcribe(str(p))
+        except ValueError:
+            # Input problems (e.g. file too large) won't be fixed by another provider.
+            raise
+        except Exception as e:
+            provider_errors_total.inc(provider=provider.name, operation="transcription")
+            last_error = e
+            continue
+
+        result = TranscriptionResult(
             transcript=transcript,
             segments=segments,
-            provider="openai",
-            model=settings.openai_transcription_model,
+            provider=provider.name,
+            model=provider.model,
         )
+        if cache is not None and provider.name != "stub":
+            cache.put(key, asdict(result))
+        return result
 
-    # Stub mode: lets you develop the rest of the pipeline without any API keys.
-    return TranscriptionResult(
-        transcript=(
-            "STUB_TRANSCRIPT: OpenAI is not configured (OPENAI_API_KEY missing). "
-            "Upload received and saved; replace this with real transcription by setting the key."
-        ),
-        segments=None,
-        provider="stub",
-        model="stub",
+    assert last_error is not None
+    raise last_error
+
+
+async def transcribe_audio_async(
+    file_path: str, *, audio_sha256: str | None = None
+) -> TranscriptionResult:
+    """
+    Async variant of transcribe_audio for request handlers (does not block the event loop).
+    """
+    return await run_blocking(transcribe_audio, file_path, audio_sha256=audio_sha256)
+
+
+@cache
+def _cache_for(root: str, max_bytes: int) -> JsonDiskCache:
+    return JsonDiskCache(root, max_bytes=max_bytes)
+
+
+def transcription_cache() -> JsonDiskCache:
+    """
+    Process-wide transcription cache under OUTPUT_DIR/cache/transcriptions.
+    """
+    root = str(Path(settings.output_dir) / "cache" / "transcriptions")
+    return _cache_for(root, settings.transcription_cache_max_bytes)
+
+
+def _transcribe_file_openai(client: OpenAI, file_path: str) -> tuple[str, list[dict] | None]:
+    segments: list[dict] | None = None
+    with open(file_path, "rb") as f:
+
+        def _create(**kwargs):
+            f.seek(0)  # each (re)try uploads the whole file again
+            return client.audio.transcriptions.create(
+                model=settings.openai_transcription_model, file=f, **kwargs
+            )
+
+        # Try to get timestamped segments (time-based transcript).
+        try:
+            resp = call_with_backoff(
+                lambda: _create(
+                    response_format="verbose_json", timestamp_granularities=["segment"]
+                ),
+                operation="transcription",
+                budgets=transcription_budgets(),
+            )
+            transcript = getattr(resp, "text", None) or ""
+            raw_segments = getattr(resp, "segments", None)
+            if isinstance(raw_segments, list):
+                segments = [_normalize_segment(s) for s in raw_segments]
+        except BadRequestError:
+            # Model without verbose_json support: fall back to a plain text transcript.
+            resp = call_with_backoff(
+                _create, operation="transcription", budgets=transcription_budgets()
+            )
+            transcript = getattr(resp, "text", None) or ""
+    return transcript, segments
+
+
+def _normalize_segment(s) -> dict:
+    if isinstance(s, dict):
+        return {"start": s.get("start"), "end": s.get("end"), "text": s.get("text") or ""}
+    return {
+        "start": getattr(s, "start", None),
+        "end": getattr(s, "end", None),
+        "text": getattr(s, "text", "") or "",
+    }
+
+
+# ---------------------------------------------------------------------------
+# Long recordings: split -> transcribe in parallel -> stitch
+# ---------------------------------------------------------------------------
+
+
+def probe_duration_seconds(file_path: str) -> float | None:
+    """
+    Return the audio duration in seconds via ffprobe, or None if ffprobe is unavailable.
+    """
+    if not shutil.which(settings.ffprobe_binary):
+        return None
+    try:
+        out = subprocess.run(
+            [
+                settings.ffprobe_binary,
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "default=noprint_wrappers=1:nokey=1",
+                file_path,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=60,
+        )
+        return float(out.stdout.strip())
+    except (subprocess.SubprocessError, ValueError):
+        return None
+
+
+def plan_windows(
+    duration: float, window_seconds: float, overlap_seconds: float
+) -> list[AudioWindow]:
+    """
+    Cover [0, duration) with windows of window_seconds that overlap by overlap_seconds.
+    """
+    step = max(1.0, window_seconds - overlap_seconds)
+    windows: list[AudioWindow] = []
+    start = 0.0
+    i = 0
+    while start < duration:
+        length = min(window_seconds, duration - start)
+        windows.append(AudioWindow(index=i, start=start, duration=length))
+        if start + length >= duration:
+            break
+        start += step
+        i += 1
+    return windows
+
+
+def extract_window(file_path: str, window: AudioWindow, out_dir: str) -> str:
+    """
+    Cut one window out of the recording as mono 16kHz MP3 (small, and all the model needs).
+    """
+    out_path = str(Path(out_dir) / f"chunk_{window.index:04d}.mp3")
+    subprocess.run(
+        [
+            settings.ffmpeg_binary,
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-y",
+            "-ss",
+            f"{window.start:.3f}",
+            "-t",
+            f"{window.duration:.3f}",
+            "-i",
+            file_path,
+            "-ac",
+            "1",
+            "-ar",
+            "16000",
+            "-b:a",
+            "64k",
+            out_path,
+        ],
+        check=True,
+        capture_output=True,
     )
+    return out_path
+
+
+def _transcribe_chunked(
+    client: OpenAI,
+    file_path: str,
+    duration: float,
+    *,
+    on_window: WindowCallback | None = None,
+) -> tuple[str, list[dict] | None]:
+    overlap = float(settings.transcription_chunk_overlap_seconds)
+    windows = plan_windows(duration, float(settings.transcription_chunk_seconds), overlap)
+
+    with tempfile.TemporaryDirectory(prefix="audio_chunks_") as tmpdir:
+
+        def _one(w: AudioWindow) -> tuple[str, list[dict] | None]:
+            chunk_path = extract_window(file_path, w, tmpdir)
+            return _transcribe_file_openai(client, chunk_path)
+
+        workers = max(1, min(settings.transcription_max_concurrency, len(windows)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe") as pool:
+            futures = [pool.submit(_one, w) for w in windows]
+            parts: list[tuple[str, list[dict] | None]] = []
+            # Windows start in order, so the earliest ones usually finish first; each is
+            # reported as soon as everything before it is in.
+            for i, future in enumerate(futures):
+                parts.append(future.result())
+                if on_window is not None:
+                    text = window_text(windows, parts, i, overlap)
+                    on_window(i, len(windows), text)
+
+    return stitch_chunks(windows, parts, overlap)
+
+
+def _keep_range(windows: list[AudioWindow], i: int, overlap_seconds: float) -> tuple[float, float]:
+    # Each overlap region is split at its midpoint between the two windows that share it.
+    lo = windows[i].start + overlap_seconds / 2 if i > 0 else float("-inf")
+    hi = windows[i + 1].start + overlap_seconds / 2 if i + 1 < len(windows) else float("inf")
+    return lo, hi
+
+
+def _window_segments(
+    windows: list[AudioWindow], i: int, segs: list[dict], overlap_seconds: float
+) -> list[dict]:
+    w = windows[i]
+    lo, hi = _keep_range(windows, i, overlap_seconds)
+    kept: list[dict] = []
+    for s in segs:
+        start = (s.get("start") or 0.0) + w.start
+        end = (s.get("end") if s.get("end") is not None else s.get("start") or 0.0) + w.start
+        mid = (start + end) / 2
+        if lo <= mid < hi:
+            kept.append({"start": start, "end": end, "text": s.get("text") or ""})
+    return kept
+
+
+def window_text(
+    windows: list[AudioWindow],
+    parts: list[tuple[str, list[dict] | None]],
+    i: int,
+    overlap_seconds: float,
+) -> str:
+    """
+    Text window i contributes to the stitched transcript, given parts for windows 0..i.
+    Matches stitch_chunks whenever every window has segments.
+    """
+    text, segs = parts[i]
+    if segs is not None:
+        kept = _window_segments(windows, i, segs, overlap_seconds)
+        return " ".join(s["text"].strip() for s in kept if s["text"].strip())
+    if i == 0:
+        return text.strip()
+    prev = " ".join(parts[i - 1][0].split())
+    return _merge_overlapping_text(prev, text)[len(prev) :].strip()
+
+
+def stitch_chunks(
+    windows: list[AudioWindow],
+    parts: list[tuple[str, list[dict] | None]],
+    overlap_seconds: float,
+) -> tuple[str, list[dict] | None]:
+    """
+    Merge per-window transcripts into one.
+
+    Segments are shifted by their window's start. Each overlap region is split at its
+    midpoint: the earlier window keeps segments centred before it, the later window keeps
+    the rest, so speech in the overlap is not duplicated. Windows without segments fall
+    back to word-level overlap removal on the plain text.
+    """
+    if all(segs is not None for _, segs in parts):
+        merged: list[dict] = []
+        for i, (_, segs) in enumerate(parts):
+            merged.extend(_window_segments(windows, i, segs or [], overlap_seconds))
+        transcript = " ".join(s["text"].strip() for s in merged if s["text"].strip())
+        return transcript, merged
+
+    transcript = ""
+    for text, _ in parts:
+        transcript = _merge_overlapping_text(transcript, text)
+    return transcript, None
+
+
+def _merge_overlapping_text(left: str, right: str, max_words: int = 60) -> str:
+    """
+    Append right to left, dropping the longest run of words that ends left and starts right.
+    """
+    if not left:
+        return right.strip()
+    if not right:
+        return left
+    lw = left.split()
+    rw = right.split()
 
+    def _norm(w: str) -> str:
+        return w.strip(".,!?;:\"'").lower()
 
+    best = 0
+    for n in range(min(max_words, len(lw), len(rw)), 0, -1):
+        if [_norm(w) for w in lw[-n:]] == [_norm(w) for w in rw[:n]]:
+            best = n
+            break
+    return " ".join(lw + rw[best:])
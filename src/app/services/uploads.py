@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import Upload
+from .jobs import create_job, enqueue_job, get_job, job_to_dict, upload_key, upload_path_for
+from .objectstore import publish_file
+from .queue import PRIORITIES
+from .storage import COPY_CHUNK_BYTES, SavedUpload, ensure_dir
+
+# Resumable upload protocol:
+#   POST /api/uploads              {file_name, size_bytes, option_id, source_id?, priority?}
+#                                  -> id, offset 0
+#   PUT  /api/uploads/{id}         Content-Range: bytes <start>-<end>/<total>, raw body
+#   GET  /api/uploads/{id}         -> offset to resume from
+#   POST /api/uploads/{id}/complete -> the job (queued for the workers)
+# Chunks are appended in order to a file under OUTPUT_DIR (so every request for one upload must
+# reach a node sharing that disk) and hashed as they arrive. With the local storage backend that
+# file already is the job's upload; with s3 it is streamed to the bucket on completion.
+# A chunk body is first received into its own part file next to it, without holding a database
+# connection; only the append to the upload file happens under the upload's row lock.
+
+
+class UploadError(ValueError):
+    status_code = 400
+
+
+class UploadOffsetMismatch(UploadError):
+    status_code = 409
+
+    def __init__(self, expected: int) -> None:
+        super().__init__(f"Chunk must start at byte {expected}.")
+        self.expected = expected
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+# Running SHA-256 per open upload, keyed by upload id, at a known offset. If a chunk arrives at
+# another process (or after a restart) the state is rebuilt from the bytes already on disk.
+_hash_lock = threading.Lock()
+_hashers: dict[str, tuple[int, Any]] = {}
+
+
+def _hasher_at(upload_id: str, path: str, offset: int):
+    with _hash_lock:
+        cached = _hashers.pop(upload_id, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+    h = hashlib.sha256()
+    remaining = offset
+    with open(path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(min(COPY_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h
+
+
+def _remember_hasher(upload_id: str, offset: int, h) -> None:
+    with _hash_lock:
+        _hashers[upload_id] = (offset, h)
+
+
+def upload_to_dict(row: Upload) -> dict[str, Any]:
+    return {
+        "id": row.id,
+        "jobId": row.job_id,
+        "status": row.status,
+        "sizeBytes": row.total_bytes,
+        "offset": row.received_bytes,
+        "chunkBytes": settings.upload_chunk_bytes,
+    }
+
+
+def create_upload(
+    db: Session,
+    output_dir: str,
+    *,
+    file_name: str | None,
+    size_bytes: int,
+    option_id: str,
+    source_id: str | None,
+    priority: str = "interactive",
+) -> dict[str, Any]:
+    if size_bytes <= 0:
+        raise UploadError("sizeBytes must be positive.")
+    if priority not in PRIORITIES:
+        raise UploadError(f"priority must be one of: {', '.join(PRIORITIES)}.")
+    if size_bytes > settings.max_upload_bytes:
+        raise UploadTooLarge(f"File is larger than the {settings.max_upload_bytes} byte limit.")
+
+    job = create_job(
+        db, file_name=file_name, option_id=option_id, source_id=source_id, priority=priority
+    )
+    now = datetime.now(UTC)
+    path = upload_path_for(output_dir, upload_key(job["id"], file_name, now))
+    ensure_dir(str(Path(path).parent))
+    open(path, "wb").close()
+
+    row = Upload(
+        id=f"upl_{uuid4().hex}",
+        job_id=job["id"],
+        created_at=now,
+        updated_at=now,
+        status="open",
+        path=path,
+        total_bytes=size_bytes,
+        received_bytes=0,
+    )
+    db.add(row)
+    db.commit()
+    return upload_to_dict(row)
+
+
+def get_upload(db: Session, upload_id: str) -> Upload:
+    row = db.get(Upload, upload_id)
+    if row is None:
+        raise FileNotFoundError(upload_id)
+    return row
+
+
+def parse_content_range(value: str | None, total_bytes: int) -> tuple[int, int]:
+    """
+    `bytes <start>-<end>/<total>` -> (start, end exclusive).
+    """
+    if not value or not value.startswith("bytes "):
+        raise UploadError("Content-Range header required (bytes <start>-<end>/<total>).")
+    try:
+        span, _, total = value[len("bytes ") :].partition("/")
+        start_s, _, end_s = span.partition("-")
+        start, end = int(start_s), int(end_s) + 1
+    except ValueError:
+        raise UploadError("Malformed Content-Range header.") from None
+    if total not in ("*", str(total_bytes)):
+        raise UploadError(f"Content-Range total must be {total_bytes}.")
+    if start < 0 or end <= start:
+        raise UploadError("Malformed Content-Range header.")
+    if end > total_bytes:
+        raise UploadTooLarge("Chunk extends past the declared file size.")
+    return start, end
+
+
+def part_paths(path: str) -> list[Path]:
+    """
+    Part files of chunks still being received for the upload at path (or left by a crash).
+    """
+    p = Path(path)
+    return sorted(p.parent.glob(f"{p.name}.*.part"))
+
+
+class ChunkWriter:
+    """
+    Receives one chunk's bytes into a part file of its own, hashing as it goes; commit_chunk
+    appends it to the upload. Refuses anything past the chunk's declared end, so oversize bodies
+    are cut off without being stored.
+    """
+
+    def __init__(self, upload_id: str, path: str, start: int, end: int) -> None:
+        self.upload_id = upload_id
+        self.start = start
+        self.end = end
+        self.offset = start
+        self.part_path = f"{path}.{uuid4().hex}.part"
+        self._hasher = _hasher_at(upload_id, path, start)
+        self._file = open(self.part_path, "wb")
+
+    def write(self, data: bytes) -> None:
+        if self.offset + len(data) > self.end:
+            raise UploadTooLarge("Request body is longer than its Content-Range.")
+        self._file.write(data)
+        self._hasher.update(data)
+        self.offset += len(data)
+
+    def close(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def abort(self) -> None:
+        self._file.close()
+        Path(self.part_path).unlink(missing_ok=True)
+
+
+def open_chunk(db: Session, upload_id: str, content_range: str | None) -> ChunkWriter:
+    """
+    Check a chunk against the upload and start receiving it. db's transaction is ended before
+    the body is read, so a slow client holds no connection or lock; commit_chunk re-checks the
+    offset under the row lock, and of two requests for the same range only the first to commit
+    wins (the other gets 409 with the new offset).
+    """
+    row = get_upload(db, upload_id)
+    status, path = row.status, row.path
+    total_bytes, received_bytes = row.total_bytes, row.received_bytes
+    db.rollback()
+    if status != "open":
+        raise UploadError("Upload is already complete.")
+    start, end = parse_content_range(content_range, total_bytes)
+    if start != received_bytes:
+        raise UploadOffsetMismatch(received_bytes)
+    return ChunkWriter(upload_id, path, start, end)
+
+
+def _append_part(path: str, start: int, part_path: str) -> None:
+    with open(path, "r+b") as out, open(part_path, "rb") as src:
+        # Drop bytes past the committed offset (left by an append interrupted before its commit).
+        out.truncate(start)
+        out.seek(start)
+        shutil.copyfileobj(src, out, length=COPY_CHUNK_BYTES)
+        out.flush()
+        os.fsync(out.fileno())
+
+
+def commit_chunk(db: Session, writer: ChunkWriter) -> dict[str, Any]:
+    """
+    Append a fully received chunk (after ChunkWriter.close) to the upload and record the new
+    resume offset, holding the upload's row lock only for the append. The part file is removed
+    whatever the outcome.
+    """
+    try:
+        if writer.offset != writer.end:
+            raise UploadError(
+                f"Body ended at byte {writer.offset}, Content-Range promised {writer.end}."
+            )
+        row = db.get(Upload, writer.upload_id, with_for_update=True)
+        if row is None:
+            raise FileNotFoundError(writer.upload_id)
+        if row.status != "open":
+            db.rollback()
+            raise UploadError("Upload is already complete.")
+        if row.received_bytes != writer.start:
+            # Another request for the same range finished first.
+            db.rollback()
+            raise UploadOffsetMismatch(row.received_bytes)
+        try:
+            _append_part(row.path, writer.start, writer.part_path)
+        except BaseException:
+            db.rollback()
+            raise
+        row.received_bytes = writer.offset
+        row.updated_at = datetime.now(UTC)
+        upload = upload_to_dict(row)
+        db.commit()
+    finally:
+        Path(writer.part_path).unlink(missing_ok=True)
+    _remember_hasher(writer.upload_id, writer.offset, writer._hasher)
+    return upload
+
+
+def complete_upload(
+    db: Session, output_dir: str, upload_id: str, *, expected_sha256: str | None = None
+) -> dict[str, Any]:
+    """
+    Finish an upload whose bytes are all in, and queue its job. Returns the job (as in /api/jobs).
+    The upload row stays locked until the job is queued, so a concurrent or retried complete
+    waits and then gets the same job instead of publishing the file again.
+    """
+    row = db.get(Upload, upload_id, with_for_update=True)
+    if row is None:
+        raise FileNotFoundError(upload_id)
+    if row.status == "completed":
+        db.rollback()
+        return job_to_dict(get_job(db, row.job_id))
+    if row.status != "open":
+        db.rollback()
+        raise UploadError("Upload has expired.")
+    if row.received_bytes != row.total_bytes:
+        raise UploadOffsetMismatch(row.received_bytes)
+
+    h = _hasher_at(row.id, row.path, row.received_bytes)
+    digest = h.hexdigest()
+    if expected_sha256 and expected_sha256.lower() != digest:
+        raise UploadError("SHA-256 does not match the uploaded bytes.")
+    with _hash_lock:
+        _hashers.pop(row.id, None)
+
+    job = get_job(db, row.job_id)
+    ref = publish_file(output_dir, upload_key(job.id, job.file_name, row.created_at), row.path)
+
+    row.status = "completed"
+    row.sha256 = digest
+    row.updated_at = datetime.now(UTC)
+    upload_seconds = (row.updated_at - row.created_at).total_seconds()
+    enqueue_job(
+        db,
+        row.job_id,
+        SavedUpload(path=ref, sha256=digest, size_bytes=row.received_bytes),
+        timings={"upload_save": round(upload_seconds, 3)},
+    )
+    return job_to_dict(get_job(db, row.job_id))
@@ -0,0 +1,225 @@
+"""
+Standalone job worker pool.
+
+Run one or more of these next to the API (on the same or other machines):
+
+    python -m src.app.worker --concurrency 4
+
+Each worker thread claims jobs from the `jobs` table (see services/queue.py),
+keeps its lease alive with heartbeats while the job runs, and releases it when done.
+A sweeper thread periodically recovers jobs left behind by crashed processes, and a GC
+thread applies the retention policy (services/retention.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from uuid import uuid4
+
+from .core.config import settings
+from .db.schema import ensure_schema
+from .db.session import SessionLocal, engine
+from .services.jobs import process_job
+from .services.metrics import start_metrics_server
+from .services.queue import ClaimedJob, claim_next_job, heartbeat, release_job, sweep_stale_jobs
+from .services.reanalysis import claim_reanalysis_run, execute_reanalysis_run
+from .services.resources import shutdown_resources
+from .services.retention import run_retention
+from .services.transcription import warm_up_transcription_provider
+
+logger = logging.getLogger("app.worker")
+
+
+def _heartbeat_loop(job_id: str, worker_id: str, done: threading.Event) -> None:
+    while not done.wait(settings.job_heartbeat_seconds):
+        db = SessionLocal()
+        try:
+            if not heartbeat(
+                db, job_id=job_id, worker_id=worker_id, lease_seconds=settings.job_lease_seconds
+            ):
+                logger.warning("lost lease on %s", job_id)
+                return
+        except Exception:
+            logger.exception("heartbeat failed for %s", job_id)
+        finally:
+            db.close()
+
+
+def sweep_once() -> None:
+    db = SessionLocal()
+    try:
+        counts = sweep_stale_jobs(
+            db,
+            upload_timeout_seconds=settings.job_upload_timeout_seconds,
+            max_attempts=settings.job_max_attempts,
+        )
+        if any(counts.values()):
+            logger.info("swept stale jobs: %s", counts)
+    except Exception:
+        logger.exception("stale job sweep failed")
+    finally:
+        db.close()
+
+
+def _sweeper_loop(stop: threading.Event) -> None:
+    while not stop.wait(settings.job_sweep_interval_seconds):
+        sweep_once()
+
+
+def gc_once() -> None:
+    db = SessionLocal()
+    try:
+        counts = run_retention(db, settings.output_dir)
+        if any(counts.values()):
+            logger.info("retention gc: %s", counts)
+    except Exception:
+        logger.exception("retention gc failed")
+    finally:
+        db.close()
+
+
+def _gc_loop(stop: threading.Event) -> None:
+    while not stop.wait(settings.retention_gc_interval_seconds):
+        gc_once()
+
+
+def reanalysis_loop(worker_id: str, stop: threading.Event) -> None:
+    # Bulk LLM re-runs (services/reanalysis.py) get their own thread and concurrency setting,
+    # so they never take job slots.
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            run_id = claim_reanalysis_run(
+                db, worker_id=worker_id, lease_seconds=settings.job_lease_seconds
+            )
+        except Exception:
+            logger.exception("reanalysis claim failed")
+            run_id = None
+        finally:
+            db.close()
+        if run_id is None:
+            stop.wait(max(settings.job_poll_interval_seconds, 5.0))
+            continue
+        logger.info("%s picked up reanalysis run %s", worker_id, run_id)
+        try:
+            status = execute_reanalysis_run(
+                run_id, worker_id=worker_id, lease_seconds=settings.job_lease_seconds, stop=stop
+            )
+            logger.info("reanalysis run %s: %s", run_id, status)
+        except Exception:
+            logger.exception("reanalysis run %s crashed", run_id)
+
+
+def _run_claimed(job: ClaimedJob, worker_id: str) -> None:
+    done = threading.Event()
+    hb = threading.Thread(
+        target=_heartbeat_loop, args=(job.job_id, worker_id, done), daemon=True
+    )
+    hb.start()
+    try:
+        process_job(
+            settings.output_dir,
+            job.job_id,
+            job.audio_path,
+        )
+    finally:
+        done.set()
+        hb.join()
+        db = SessionLocal()
+        try:
+            release_job(db, job_id=job.job_id, worker_id=worker_id)
+        finally:
+            db.close()
+
+
+def worker_loop(worker_id: str, stop: threading.Event) -> None:
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            job = claim_next_job(
+                db,
+                worker_id=worker_id,
+                lease_seconds=settings.job_lease_seconds,
+                max_attempts=settings.job_max_attempts,
+            )
+        except Exception:
+            logger.exception("claim failed")
+            job = None
+        finally:
+            db.close()
+
+        if job is None:
+            stop.wait(settings.job_poll_interval_seconds)
+            continue
+
+        logger.info("%s picked up %s (attempt %d)", worker_id, job.job_id, job.attempts)
+        try:
+            _run_claimed(job, worker_id)
+        except Exception:
+            logger.exception("job %s crashed", job.job_id)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Process queued transcription/insight jobs.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.worker_concurrency,
+        help="Number of jobs this process runs at once.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.worker_metrics_port,
+        help="Serve Prometheus /metrics on this port (0 = off).",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    ensure_schema(engine)
+    # Load local models once per worker process, before the first job arrives.
+    warm_up_transcription_provider()
+
+    if args.metrics_port and settings.metrics_enabled:
+        start_metrics_server(args.metrics_port)
+        logger.info("metrics on :%d/metrics", args.metrics_port)
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+    stop = threading.Event()
+
+    def _on_signal(signum, _frame) -> None:
+        logger.info("signal %s received, finishing in-flight jobs", signum)
+        stop.set()
+
+    signal.signal(signal.SIGINT, _on_signal)
+    signal.signal(signal.SIGTERM, _on_signal)
+
+    threads = [
+        threading.Thread(target=worker_loop, args=(f"{prefix}:{i}", stop), name=f"worker-{i}")
+        for i in range(max(1, args.concurrency))
+    ]
+    sweep_once()
+    threading.Thread(target=_sweeper_loop, args=(stop,), name="sweeper", daemon=True).start()
+    threading.Thread(target=_gc_loop, args=(stop,), name="retention-gc", daemon=True).start()
+    reanalysis = threading.Thread(
+        target=reanalysis_loop, args=(f"{prefix}:reanalysis", stop), name="reanalysis"
+    )
+    reanalysis.start()
+    for t in threads:
+        t.start()
+    logger.info("started %d worker(s) as %s", len(threads), prefix)
+    for t in threads:
+        t.join()
+    reanalysis.join()
+    shutdown_resources()
+
+
+if __name__ == "__main__":
+    main()